@@ -0,0 +1,166 @@
+"""Аналітика завантаженості рейсів для адміністратора.
+
+Звіт не перебирає бронювання: денний rollup — це зайняті місця на рейс
+(trip_key -> місця). Поточні рейси TripIndex уже тримає актуальними, а
+минулі, бронювання яких прибрано (partitions.expire_user, archive),
+лишаються в документі "rollups". Occupancy тримає їх кошиками по днях:
+день -> {(хвилина, напрямок): місця}, і відсортований список днів.
+Кошики латаються лише там, де щось змінилося: рейси з
+TripIndex.changed_since (бронювання, скасування — і всі рейси частини,
+перечитаної зі сховища) та ключі, які змінились у "rollups". Діапазон
+дат — бінарний пошук по списку днів, далі агрегування лише по ньому.
+
+    occ = occupancy.report(start, end, base_times_for)
+"""
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+
+from config import TRIP_CAPACITY
+from records import Direction, Route, parse_day, parse_minute
+from store import DEFAULTS, get_store
+from trips import trip_index
+
+DIRECTIONS = list(Direction)
+
+
+class Occupancy:
+
+    def __init__(self):
+        self.changes = 0  # остання зміна TripIndex, яку вже враховано
+        self.rollups_version = None
+        self.rolled = {}  # документ "rollups"
+        self.parsed = {}  # trip_key -> (день, хвилина, напрямок) | None
+        self.buckets = {}  # день -> {(хвилина, напрямок): місця}
+        self.days = []  # дні, для яких є кошики, за зростанням
+        self.routes_version = None
+        self.routes = []
+
+    def _parse(self, key):
+        date_str, time_str, direction = key.split(" ", 2)
+        try:
+            return (parse_day(date_str), parse_minute(time_str),
+                    DIRECTIONS.index(Direction(direction)))
+        except ValueError:
+            return None
+
+    def fresh(self):
+        keys = trip_index.fresh().changed_since(self.changes)
+        self.changes = trip_index.changes
+        store = get_store()
+        version = store.version("rollups")
+        if version != self.rollups_version:
+            rolled = store.load("rollups", DEFAULTS["rollups"])
+            keys.extend(k for k in rolled.keys() | self.rolled.keys()
+                        if rolled.get(k) != self.rolled.get(k))
+            self.rolled, self.rollups_version = rolled, version
+        for key in keys:
+            self._patch(key)
+        return self
+
+    def _patch(self, key):
+        if key not in self.parsed:
+            self.parsed[key] = self._parse(key)
+        trip = self.parsed[key]
+        if trip is None:
+            return
+        day, minute, d = trip
+        # рейс, частину бронювань якого вже прибрано, — з історії
+        seats = max(trip_index.seats.get(key, 0), self.rolled.get(key, 0))
+        bucket = self.buckets.get(day)
+        if seats:
+            if bucket is None:
+                bucket = self.buckets[day] = {}
+                insort(self.days, day)
+            bucket[(minute, d)] = seats
+        elif bucket is not None:
+            bucket.pop((minute, d), None)
+            if not bucket:
+                del self.buckets[day]
+                del self.days[bisect_left(self.days, day)]
+
+    def _fresh_routes(self):
+        store = get_store()
+        version = store.version("routes")
+        if version != self.routes_version:
+            routes = []
+            for raw in store.load("routes", DEFAULTS["routes"]).values():
+                try:
+                    routes.append(Route.from_dict(raw))
+                except (KeyError, TypeError, ValueError):
+                    continue
+            self.routes = routes
+            self.routes_version = version
+        return self.routes
+
+    def span(self, start: date, end: date):
+        """Дні [start, end], для яких є кошики."""
+        self.fresh()
+        return self.days[bisect_left(self.days, start.toordinal()):
+                         bisect_right(self.days, end.toordinal())]
+
+    def report(self, start: date, end: date, times_for,
+               capacity=TRIP_CAPACITY):
+        """Завантаженість за напрямком і часом, за днем тижня, повні/порожні
+        рейси та завантаженість водіїв. times_for(direction) — розклад;
+        рейс без бронювань рахується як порожній."""
+        booked = {(day, minute, d): seats
+                  for day in self.span(start, end)
+                  for (minute, d), seats in self.buckets[day].items()}
+
+        slots = {}  # (напрямок, хвилина) -> [місця, рейсів, повних, порожніх]
+        weekdays = {}  # (напрямок, день тижня) -> [місця, рейсів]
+        first, last = start.toordinal(), end.toordinal()
+        schedule = {
+            d: [parse_minute(t) for t in times_for(str(direction))]
+            for d, direction in enumerate(DIRECTIONS)
+        }
+        departures = {(day, minute, d)
+                      for day in range(first, last + 1)
+                      for d, minutes in schedule.items()
+                      for minute in minutes}
+        departures.update(booked)  # рейси поза розкладом, якщо бронювали
+        for day, minute, d in departures:
+            seats = booked.get((day, minute, d), 0)
+            s = slots.setdefault((d, minute), [0, 0, 0, 0])
+            s[0] += seats
+            s[1] += 1
+            s[2] += seats >= capacity
+            s[3] += seats == 0
+            w = weekdays.setdefault((d, (day + 6) % 7), [0, 0])
+            w[0] += seats
+            w[1] += 1
+
+        drivers = {}  # driver_id -> [рейсів, місць]
+        for route in self._fresh_routes():
+            if not first <= route.day <= last:
+                continue
+            try:
+                d = DIRECTIONS.index(Direction(route.direction))
+            except ValueError:
+                continue
+            u = drivers.setdefault(route.driver_id, [0, 0])
+            u[0] += 1
+            u[1] += booked.get((route.day, route.minute, d), 0)
+
+        def ratio(seats, trips):
+            return seats / (trips * capacity) if trips else 0.0
+
+        return {
+            "slots": {
+                (DIRECTIONS[d], m): (ratio(s[0], s[1]), s[2], s[3], s[1])
+                for (d, m), s in sorted(slots.items())
+            },
+            "weekdays": {
+                (DIRECTIONS[d], wd): ratio(*w)
+                for (d, wd), w in sorted(weekdays.items())
+            },
+            "drivers": {
+                did: (u[0], u[1], ratio(u[1], u[0]))
+                for did, u in sorted(drivers.items(), key=lambda x: -x[1][0])
+            },
+            "seats": sum(booked.values()),
+            "departures": len(departures),
+        }
+
+
+occupancy = Occupancy()
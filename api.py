@@ -0,0 +1,223 @@
+"""HTTP API лише для читання — для екранів диспетчерів.
+
+Працює в тому ж циклі подій, що й бот (aiohttp уже є з aiogram), і
+відповідає з індексів у пам'яті (TripIndex, LockIndex, Waitlist), не
+читаючи бронювання з диска. ETag відповіді — версії документів, з яких
+вона зібрана, тож опитування без змін — це кілька перевірок версій і
+304 без тіла; зібрана відповідь кешується до наступної зміни версій.
+
+    GET /api/trips?date=2025-10-30    рейси дня: місця, черга, водій
+    GET /api/trips/<ID рейсу>         маніфест: бронювання і черга
+    GET /api/routes?from=...&to=...   призначення водіїв (типово 7 днів)
+
+API_PORT=0 — вимкнено. Якщо задано API_TOKEN, потрібен заголовок
+"Authorization: Bearer <токен>" (у відповідях є телефони пасажирів).
+"""
+import hmac
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta
+
+from aiohttp import web
+
+import jsonio
+import partitions
+from config import API_HOST, API_PORT, API_TOKEN, TRIP_CAPACITY
+from records import Direction
+from store import DEFAULTS, get_store
+from trips import (lock_index, trip_from_id, trip_id, trip_index, trip_key,
+                   waitlist)
+
+log = logging.getLogger("api")
+
+# JsonStore рахує версії з нуля в кожному процесі — ETag іншого запуску
+# не повинен збігтися
+_BOOT = f"{os.getpid():x}-{int(time.time()):x}"
+_CACHE_SIZE = 256
+
+_runner = None
+_bodies = {}  # шлях із запитом -> (ETag, тіло)
+
+
+def _etag(names, *extra):
+    """ETag за версіями документів; bookings — усіх частин разом."""
+    store = get_store()
+    versions = [
+        partitions.version(store) if n == "bookings" else store.version(n)
+        for n in names
+    ]
+    return '"' + ".".join(map(str, (_BOOT, *versions, *extra))) + '"'
+
+
+def _fresh():
+    trip_index.fresh()
+    lock_index.fresh()
+    waitlist.fresh()
+
+
+def _drivers():
+    """id -> {"id", "name", "phone"} водіїв."""
+    from handlers.common import drivers_list
+
+    return {d["id"]: {"id": d["id"], "name": d.get("name"),
+                      "phone": d.get("phone")} for d in drivers_list()}
+
+
+def _routes():
+    """trip_key -> driver_id призначених рейсів."""
+    out = {}
+    for r in get_store().load("routes", DEFAULTS["routes"]).values():
+        try:
+            out[trip_key(r["date"], r["time"], r["direction"])] = \
+                int(r["driver_id"])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return out
+
+
+def _trip(key, routes, drivers):
+    date_str, time_str, direction = key.split(" ", 2)
+    booked = trip_index.seats.get(key, 0)
+    driver_id = routes.get(key)
+    return {
+        "id": trip_id(key),
+        "date": date_str,
+        "time": time_str,
+        "direction": direction,
+        "booked": booked,
+        "free": max(TRIP_CAPACITY - booked, 0),
+        "bookings": len(trip_index.trips.get(key, ())),
+        "locked": key in lock_index.locked,
+        "waitlist": len(waitlist.queues.get(key, ())),
+        "driver": (drivers.get(driver_id, {"id": driver_id})
+                   if driver_id is not None else None),
+    }
+
+
+def _day_param(request, name, default):
+    raw = request.query.get(name)
+    if raw is None:
+        return default
+    try:
+        return datetime.strptime(raw, "%Y-%m-%d").date()
+    except ValueError:
+        raise web.HTTPBadRequest(text=f"{name}: очікується РРРР-ММ-ДД")
+
+
+# ====================== ВІДПОВІДІ ======================
+def trips_of_day(day: date):
+    """Рейси дня за розкладом і ті, на які є бронювання поза ним."""
+    from handlers.common import base_times_for
+
+    _fresh()
+    date_str = str(day)
+    keys = {trip_key(date_str, t, str(d))
+            for d in Direction for t in base_times_for(str(d))}
+    keys.update(k for k in trip_index.trips if k.startswith(date_str))
+    routes, drivers = _routes(), _drivers()
+    trips = sorted((_trip(k, routes, drivers) for k in keys),
+                   key=lambda t: (t["time"], t["direction"]))
+    return {"date": date_str, "trips": trips}
+
+
+def manifest(key: str):
+    _fresh()
+    body = _trip(key, _routes(), _drivers())
+    body["passengers"] = [
+        {"uid": uid, "phone": b.phone, "seats": b.seats,
+         "comment": b.comment, "created_at": b.created_at,
+         "created_by_driver": b.created_by_driver}
+        for uid, b in trip_index.trips.get(key, ())]
+    body["queue"] = [
+        {"uid": e["uid"], "phone": e["booking"].get("phone"),
+         "seats": int(e["booking"].get("seats", 1))}
+        for e in waitlist.queues.get(key, ())]
+    return body
+
+
+def assignments(start: date, end: date):
+    drivers = _drivers()
+    first, last = str(start), str(end)
+    routes = [{"id": trip_id(key), "date": key[:10], "time": key[11:16],
+               "direction": key[17:],
+               "driver": drivers.get(did, {"id": did})}
+              for key, did in _routes().items()
+              if first <= key[:10] <= last]
+    routes.sort(key=lambda r: (r["date"], r["time"], r["direction"]))
+    return {"from": first, "to": last, "routes": routes}
+
+
+# ====================== HTTP ======================
+def _respond(request, etag, build):
+    """304, якщо клієнт має актуальну версію; інакше тіло з кешу або
+    зібране build() заново."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("If-None-Match", "").split(", "):
+        return web.Response(status=304, headers=headers)
+    cached = _bodies.get(request.path_qs)
+    if cached is None or cached[0] != etag:
+        if len(_bodies) >= _CACHE_SIZE:
+            _bodies.clear()
+        cached = _bodies[request.path_qs] = (etag,
+                                             jsonio.dumps(build(),
+                                                          compact=True))
+    return web.Response(body=cached[1], headers=headers,
+                        content_type="application/json", charset="utf-8")
+
+
+async def get_trips(request):
+    day = _day_param(request, "date", date.today())
+    etag = _etag(("bookings", "locks", "waitlist", "routes", "drivers"),
+                 day.toordinal())
+    return _respond(request, etag, lambda: trips_of_day(day))
+
+
+async def get_manifest(request):
+    try:
+        key = trip_from_id(request.match_info["tid"])
+    except (IndexError, ValueError):
+        raise web.HTTPNotFound(text="Невідомий рейс")
+    etag = _etag(("bookings", "locks", "waitlist", "routes", "drivers"))
+    return _respond(request, etag, lambda: manifest(key))
+
+
+async def get_routes(request):
+    start = _day_param(request, "from", date.today())
+    end = _day_param(request, "to", start + timedelta(days=7))
+    etag = _etag(("routes", "drivers"))
+    return _respond(request, etag, lambda: assignments(start, end))
+
+
+@web.middleware
+async def _auth(request, handler):
+    # порівняння за сталий час: за часом відповіді токен не вгадати
+    if API_TOKEN and not hmac.compare_digest(
+            request.headers.get("Authorization", ""), f"Bearer {API_TOKEN}"):
+        raise web.HTTPUnauthorized(text="Потрібен API_TOKEN")
+    return await handler(request)
+
+
+def create_app() -> web.Application:
+    app = web.Application(middlewares=[_auth])
+    app.router.add_get("/api/trips", get_trips)
+    app.router.add_get("/api/trips/{tid}", get_manifest)
+    app.router.add_get("/api/routes", get_routes)
+    return app
+
+
+async def start(host=API_HOST, port=API_PORT):
+    """Запускає API в поточному циклі подій; port=0 — ні."""
+    global _runner
+    if port and _runner is None:
+        _runner = web.AppRunner(create_app(), access_log=None)
+        await _runner.setup()
+        await web.TCPSite(_runner, host, port).start()
+        log.info("API: http://%s:%d/api/trips", host, port)
+
+
+async def stop():
+    global _runner
+    if _runner is not None:
+        await _runner.cleanup()
+        _runner = None
@@ -0,0 +1,157 @@
+"""Збирання застосунку: диспетчер, бот і фаза старту.
+
+    dp = create_dispatcher()   # без мережі — можна в тестах і утилітах
+    bot = create_bot()         # лише тут потрібен BOT_TOKEN
+    await dp.start_polling(bot)
+
+Імпорт цього модуля (як і handlers) нічого не створює. Роутери з handlers —
+одні на процес, тож і диспетчер створюється один раз.
+"""
+import asyncio
+import logging
+import time
+
+from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.memory import MemoryStorage
+
+import api
+import backup
+import manifests
+import partitions
+import recurring
+from config import BOT_TOKEN, FSM_STORAGE, THROTTLE
+from store import DEFAULTS, CorruptDocument, SqliteFSMStorage, get_store
+
+log = logging.getLogger("app")
+
+
+def create_dispatcher(throttle=THROTTLE, fsm_storage=FSM_STORAGE,
+                      background=True):
+    """background — фонові задачі процесу: знімки сховища, регулярні
+    поїздки, живі маніфести й HTTP API (якщо задано API_PORT). У кластері
+    їх веде координатор, а не воркери."""
+    from handlers import routers
+    from middlewares import ThrottlingMiddleware
+
+    storage = (SqliteFSMStorage()
+               if fsm_storage == "sqlite" else MemoryStorage())
+    dp = Dispatcher(storage=storage)
+    if throttle:
+        throttling = ThrottlingMiddleware()
+        dp.message.outer_middleware(throttling)
+        dp.callback_query.outer_middleware(throttling)
+    dp.include_routers(*routers)
+    dp.startup.register(preload)
+    if background:
+        dp.startup.register(backup.start)
+        dp.startup.register(recurring.start)
+        dp.startup.register(manifests.start)
+        dp.startup.register(api.start)
+        dp.shutdown.register(backup.stop)
+        dp.shutdown.register(recurring.stop)
+        dp.shutdown.register(manifests.stop)
+        dp.shutdown.register(api.stop)
+    return dp
+
+
+def create_bot(token=BOT_TOKEN, session=None):
+    if not token:
+        raise RuntimeError("BOT_TOKEN не задано (змінна середовища)")
+    if session is None:
+        return Bot(token=token)
+    return Bot(token=token, session=session)
+
+
+# ====================== STARTUP ======================
+def _checked(name, doc):
+    if not isinstance(doc, type(DEFAULTS[name])):
+        raise CorruptDocument(
+            name, f"очікувався {type(DEFAULTS[name]).__name__}, "
+            f"маємо {type(doc).__name__}")
+    return doc
+
+
+def _read(name):
+    """Документ і версія, з якою його прочитано. Пошкоджений документ (не
+    розбирається або не того типу) замінюється останньою доброю копією зі
+    знімків; якщо її немає — CorruptDocument."""
+    store = get_store()
+    version = store.version(name)
+    try:
+        doc = _checked(name, store.load(name, DEFAULTS[name]))
+    except CorruptDocument as e:
+        log.error("%s", e)
+        backup.recover(name, store)
+        version = store.version(name)
+        doc = _checked(name, store.load(name, DEFAULTS[name]))
+    return doc, version
+
+
+def _read_shard(shard):
+    """Частина бронювань як (рядки, версія); пошкоджена — як у _read."""
+    store = get_store()
+    version = store.version(shard)
+    try:
+        return partitions.read(shard), version
+    except CorruptDocument as e:
+        log.error("%s", e)
+        backup.recover(shard, store)
+        return partitions.read(shard), store.version(shard)
+
+
+async def _read_all():
+    """Усі документи й усі частини бронювань (у будь-якій розкладці —
+    migrate читає обидві), паралельно, з відновленням пошкоджених."""
+    names = list(DEFAULTS)
+    read = await asyncio.gather(*(asyncio.to_thread(_read, n) for n in names))
+    parts = await asyncio.to_thread(get_store().parts, partitions.SINGLE)
+    shards = await asyncio.gather(*(asyncio.to_thread(_read_shard, s)
+                                    for s in parts))
+    return dict(zip(names, read)), dict(zip(parts, shards))
+
+
+async def preload():
+    """Читає й перевіряє всі документи паралельно, виконує міграції
+    старих форматів і прогріває індекси та клавіатури — щоб перші запити
+    після рестарту не платили за це. Повертає час кожного кроку, мс."""
+    from handlers.common import _menu, roles
+    from phones import phone_index
+    from trips import lock_index, trip_index, waitlist
+
+    t0 = time.perf_counter()
+    # спершу читання: migrate не відновлює пошкоджених документів
+    docs, parts = await _read_all()
+    # BOOKINGS_LAYOUT змінили — бронювання переносяться в нову розкладку
+    if await asyncio.to_thread(partitions.migrate):
+        docs, parts = await _read_all()
+    if partitions.LAYOUT == "daily":
+        loaded = {s: v for s, v in parts.items() if s != partitions.META}
+    else:
+        doc, version = docs["bookings"]
+        loaded = {partitions.SINGLE: (partitions.rows(partitions.SINGLE, doc),
+                                      version)}
+    t_read = time.perf_counter()
+
+    # індекси не мають блокувань (TripIndex і PhoneIndex ведуть ті самі
+    # частини) — прогріваємо по черзі в потоці циклу, паралельне лише
+    # читання вище. roles.fresh() сам мігрує admins/drivers і пише їх
+    trip_index.fresh(loaded)
+    phone_index.fresh(loaded)
+    lock_index.prime(*docs["locks"])
+    waitlist.prime(*docs["waitlist"])
+    roles.fresh()
+    _menu(False)
+    _menu(True)
+    t_warm = time.perf_counter()
+
+    timings = {
+        "read": (t_read - t0) * 1000,
+        "warm": (t_warm - t_read) * 1000,
+        "total": (t_warm - t0) * 1000,
+    }
+    log.info(
+        "Старт: документи %.1f мс, індекси %.1f мс, разом %.1f мс; "
+        "рейсів %d, пошкоджених бронювань %d", timings["read"],
+        timings["warm"], timings["total"], len(trip_index.trips),
+        trip_index.invalid)
+    return timings
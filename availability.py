@@ -0,0 +1,76 @@
+"""Вільні місця на рейсах — для inline-пошуку.
+
+Вигляд: (день, напрямок) -> [(хвилина, вільні місця)] лише для рейсів,
+де пасажир може бронювати без черги (не заблоковано, черга порожня,
+місця є). Кошик дня рахується з індексів у пам'яті (TripIndex, LockIndex,
+Waitlist) і тримається, доки в котромусь із них не зміниться рейс цього
+дня (номери змін дня — days), тож відповідь на запит не читає сховище.
+Бронювання, скасування і блокування оновлюють самі індекси інкрементно;
+після них перераховуються лише кошики тих днів, яких зміна торкнулася, і
+лише коли про них питають.
+
+    availability.search(days, directions, seats, base_times_for)
+"""
+from datetime import date, datetime, timedelta
+
+from config import TRIP_CAPACITY
+from records import day_str, parse_minute
+from trips import MIN_LEAD, lock_index, trip_index, trip_key, waitlist
+
+
+class Availability:
+
+    def __init__(self):
+        # (день, напрямок) -> (номери змін дня, [(хвилина, вільно)])
+        self.buckets = {}
+
+    @staticmethod
+    def _fresh():
+        trip_index.fresh()
+        lock_index.fresh()
+        waitlist.fresh()
+
+    def slots(self, day: int, direction, times_for, fresh=True):
+        """[(хвилина, вільні місця)] відкритих рейсів дня за розкладом."""
+        if fresh:
+            self._fresh()
+        date_str = day_str(day)
+        stamps = (trip_index.days.get(date_str), lock_index.days.get(date_str),
+                  waitlist.days.get(date_str))
+        cached = self.buckets.get((day, direction))
+        if cached is None or cached[0] != stamps:
+            free = []
+            for t in times_for(direction):
+                key = trip_key(date_str, t, direction)
+                left = TRIP_CAPACITY - trip_index.seats.get(key, 0)
+                if (left > 0 and key not in lock_index.locked
+                        and key not in waitlist.queues):
+                    free.append((parse_minute(t), left))
+            cached = self.buckets[(day, direction)] = (stamps, free)
+        return cached[1]
+
+    def search(self, days, directions, seats, times_for, now=None):
+        """[(день, хвилина, напрямок, вільно)] рейсів, куди ще можна
+        забронювати seats місць, за часом відправлення."""
+        now = now or datetime.now()
+        cutoff = now + MIN_LEAD
+        today = now.date().toordinal()
+        # кошики минулих днів більше не знадобляться
+        for k in [k for k in self.buckets if k[0] < today]:
+            del self.buckets[k]
+        self._fresh()
+        found = []
+        for day in sorted(days):
+            start = datetime.combine(date.fromordinal(day),
+                                     datetime.min.time())
+            for direction in directions:
+                for minute, left in self.slots(day, direction, times_for,
+                                               fresh=False):
+                    if (left >= seats
+                            and start + timedelta(minutes=minute) > cutoff):
+                        found.append((day, minute, direction, left))
+        found.sort(key=lambda x: (x[0], x[1]))
+        return found
+
+
+availability = Availability()
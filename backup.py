@@ -0,0 +1,216 @@
+"""Знімки сховища: інкрементні, стиснені, з ротацією, і відновлення.
+
+    backups/
+      objects/<sha256>.json.gz   вміст документа; однаковий — один файл
+      20251030-120000.json       знімок: {документ: sha256}
+
+Знімок пише лише документи, вміст яких ще не зберігався, і взагалі нічого
+не робить, якщо з попереднього знімка версії документів не змінилися.
+Тримаються BACKUP_KEEP останніх знімків; об'єкти, на які вже ніхто не
+посилається, видаляються.
+
+    python backup.py snapshot
+    python backup.py list
+    python backup.py restore [ЗНІМОК] [ДОКУМЕНТ ...]
+
+Відновлення пише через сховище, тож бот, що працює, підхоплює його без
+перезапуску (JsonStore помічає зміну файлу, SqliteStore — версію).
+"""
+import asyncio
+import gzip
+import hashlib
+import logging
+import os
+import shutil
+import sys
+import time
+
+import jsonio
+import partitions
+from config import BACKUP_DIR, BACKUP_INTERVAL, BACKUP_KEEP
+from store import (DOCUMENTS, PARTITIONED, CorruptDocument, JsonStore,
+                   get_store)
+
+log = logging.getLogger("backup")
+
+_last_versions = None  # версії документів на момент останнього знімка
+_task = None
+
+
+def _objects(root):
+    return os.path.join(root, "objects")
+
+
+def snapshots(root=BACKUP_DIR):
+    """Імена знімків від найновішого."""
+    if not os.path.isdir(root):
+        return []
+    return sorted((f[:-5] for f in os.listdir(root) if f.endswith(".json")),
+                  reverse=True)
+
+
+def manifest(snapshot, root=BACKUP_DIR):
+    return jsonio.load(os.path.join(root, f"{snapshot}.json"))
+
+
+def read_object(digest, root=BACKUP_DIR):
+    with gzip.open(os.path.join(_objects(root), f"{digest}.json.gz")) as f:
+        return jsonio.loads(f.read())
+
+
+def _names(store):
+    """Документи і їхні частини (бронювання по днях — див. partitions)."""
+    names = list(DOCUMENTS)
+    for prefix in PARTITIONED:
+        names.extend(sorted(store.parts(prefix)))
+    return names
+
+
+def snapshot(store=None, root=BACKUP_DIR, keep=BACKUP_KEEP, force=False):
+    """Робить знімок; повертає його ім'я або None, якщо змін не було.
+    Незмінні частини (минулі дні) займають у знімку лише рядок маніфесту."""
+    global _last_versions
+    store = store or get_store()
+    names = _names(store)
+    versions = {name: store.version(name) for name in names}
+    if not force and versions == _last_versions:
+        return None
+    os.makedirs(_objects(root), exist_ok=True)
+    entry = {}
+    for name in names:
+        try:
+            doc = store.load(name, None)
+        except CorruptDocument as e:
+            log.error("%s — у знімок не потрапить", e)
+            continue
+        if doc is None:  # документа ще немає
+            continue
+        raw = jsonio.dumps(doc, compact=True)
+        digest = hashlib.sha256(raw).hexdigest()
+        path = os.path.join(_objects(root), f"{digest}.json.gz")
+        if not os.path.exists(path):
+            jsonio.write_atomic(path, gzip.compress(raw, 6))
+        entry[name] = digest
+    name = stamp = time.strftime("%Y%m%d-%H%M%S")
+    for i in range(1, 100):  # кілька знімків за секунду
+        if not os.path.exists(os.path.join(root, f"{name}.json")):
+            break
+        name = f"{stamp}-{i}"
+    jsonio.write_atomic(os.path.join(root, f"{name}.json"),
+                        jsonio.dumps(entry, compact=False))
+    _last_versions = versions
+    _rotate(root, keep)
+    return name
+
+
+def _rotate(root, keep):
+    names = snapshots(root)
+    for old in names[keep:]:
+        os.remove(os.path.join(root, f"{old}.json"))
+    used = {d for s in names[:keep] for d in manifest(s, root).values()}
+    for f in os.listdir(_objects(root)):
+        if f.endswith(".json.gz") and f[:-8] not in used:
+            os.remove(os.path.join(_objects(root), f))
+
+
+def last_good(name, root=BACKUP_DIR):
+    """(знімок, вміст) документа з найновішого знімка, де він читається."""
+    for snap in snapshots(root):
+        digest = manifest(snap, root).get(name)
+        if digest is None:
+            continue
+        try:
+            return snap, read_object(digest, root)
+        except (OSError, EOFError, ValueError):
+            continue
+    return None, None
+
+
+def recover(name, store=None, root=BACKUP_DIR):
+    """Замінює пошкоджений документ останньою доброю копією. Пошкоджений
+    файл JsonStore зберігається поруч як *.corrupt-ЧАС."""
+    store = store or get_store()
+    snap, doc = last_good(name, root)
+    if snap is None:
+        raise CorruptDocument(name, "і немає знімка для відновлення")
+    if isinstance(store, JsonStore) and os.path.exists(store.path(name)):
+        suffix = time.strftime("%Y%m%d-%H%M%S")
+        shutil.copy2(store.path(name), f"{store.path(name)}.corrupt-{suffix}")
+    store.save(name, doc)
+    log.warning("Документ %r відновлено зі знімка %s", name, snap)
+    return snap
+
+
+def restore(snap=None, names=None, store=None, root=BACKUP_DIR):
+    """Відновлює документи зі знімка (за замовчуванням — усі з
+    найновішого). Перед цим робить знімок поточного стану."""
+    store = store or get_store()
+    snap = snap or next(iter(snapshots(root)), None)
+    if snap is None:
+        raise FileNotFoundError(f"У {root} немає знімків")
+    entry = manifest(snap, root)
+    # читаємо до нового знімка: його ротація може прибрати старі об'єкти
+    docs = {name: read_object(entry[name], root) for name in names or entry}
+    before = snapshot(store, root, force=True)
+    for name, doc in docs.items():
+        if name != partitions.META:
+            store.save(name, doc)
+    if not names:  # частини, яких на момент знімка ще не було
+        for prefix in PARTITIONED:
+            for name in store.parts(prefix).keys() - entry.keys():
+                store.delete(name)
+    # версія бронювань по днях — наостанок, коли всі частини вже на місці
+    if any("/" in name for name in docs) or store.parts(partitions.SINGLE):
+        store.save(partitions.META, docs.get(partitions.META, {}))
+    return before
+
+
+# ====================== ПЕРІОДИЧНІ ЗНІМКИ ======================
+async def _periodic(interval):
+    while True:
+        try:
+            name = await asyncio.to_thread(snapshot)
+            if name:
+                log.info("Знімок сховища %s", name)
+        except Exception:
+            log.exception("Не вдалося зробити знімок")
+        await asyncio.sleep(interval)
+
+
+async def start(interval=BACKUP_INTERVAL):
+    """Запускає знімки у фоні (перший — одразу); interval 0 — вимкнено."""
+    global _task
+    if interval > 0 and _task is None:
+        _task = asyncio.create_task(_periodic(interval))
+
+
+async def stop():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        _task = None
+
+
+def main(argv):
+    cmd = argv[0] if argv else None
+    if cmd == "snapshot":
+        print(snapshot(force=True))
+    elif cmd == "list":
+        for snap in snapshots():
+            print(snap, " ".join(manifest(snap)))
+    elif cmd == "restore":
+        docs = [a for a in argv[1:]
+                if a in DOCUMENTS or a.split("/")[0] in PARTITIONED]
+        snap = argv[1] if len(argv) > 1 and argv[1] not in docs else None
+        names = [a for a in docs if a != snap]
+        before = restore(snap, names or None)
+        print(f"Відновлено; попередній стан збережено як {before}")
+    else:
+        print("Використання: python backup.py snapshot | list | "
+              "restore [ЗНІМОК] [ДОКУМЕНТ ...]")
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
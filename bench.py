@@ -0,0 +1,270 @@
+"""Бенчмарки сховищ бота на синтетичних даних.
+
+    python bench.py json [USERS]
+    python bench.py records [USERS]
+    python bench.py routing [UPDATES]
+    python bench.py analytics [USERS]
+    python bench.py partitions [USERS]
+"""
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import jsonio
+from records import passengers_from_json
+
+DIRECTIONS = ("🚐 Київ → Рокитне", "🚌 Рокитне → Київ")
+
+
+def synthetic_bookings(users=5000, per_user=8, seed=1):
+    rnd = random.Random(seed)
+    start = date(2025, 1, 1)
+    data = {}
+    for i in range(users):
+        uid = str(100000000 + i)
+        phone = f"380{rnd.randrange(10**8, 10**9)}"
+        bookings = []
+        for _ in range(per_user):
+            d = start + timedelta(days=rnd.randrange(365))
+            bookings.append({
+                "date": str(d),
+                "time": f"{rnd.randrange(5, 21):02d}:00",
+                "direction": rnd.choice(DIRECTIONS),
+                "seats": str(rnd.randint(1, 3)),
+                "comment": rnd.choice(("Автостанція Південна",
+                                       "Біля автостанції")),
+                "phone": phone,
+                "created_by_driver": False,
+                "driver_id": None,
+                "created_at": f"{d} 0{rnd.randrange(10)}:00:00"
+            })
+        data[uid] = {"bookings": bookings, "phone": phone}
+    return data
+
+
+def best_of(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_json(users=5000):
+    data = synthetic_bookings(users)
+    variants = [("json", False), ("json", True)]
+    if jsonio.orjson is not None:
+        variants += [("orjson", False), ("orjson", True)]
+
+    base_dump = base_parse = None
+    print(f"{'backend':<8} {'format':<8} {'size KB':>9} {'dump ms':>9} "
+          f"{'parse ms':>9} {'dump x':>7} {'parse x':>7}")
+    for name, compact in variants:
+        raw = jsonio.dumps(data, compact=compact, backend_name=name)
+        t_dump = best_of(
+            lambda: jsonio.dumps(data, compact=compact, backend_name=name))
+        t_parse = best_of(lambda: jsonio.loads(raw, backend_name=name))
+        if base_dump is None:
+            base_dump, base_parse = t_dump, t_parse
+        print(f"{name:<8} {'compact' if compact else 'pretty':<8} "
+              f"{len(raw) / 1024:>9.0f} {t_dump * 1000:>9.1f} "
+              f"{t_parse * 1000:>9.1f} {base_dump / t_dump:>7.1f} "
+              f"{base_parse / t_parse:>7.1f}")
+
+
+def _allocated(build):
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+
+def bench_records(users=5000):
+    raw = jsonio.dumps(synthetic_bookings(users), compact=True)
+    n = sum(len(u["bookings"]) for u in jsonio.loads(raw).values())
+    dicts, dict_bytes = _allocated(lambda: jsonio.loads(raw))
+    # записи будуються з окремого розбору, щоб не ділити рядки з dicts
+    recs, rec_bytes = _allocated(
+        lambda: passengers_from_json(jsonio.loads(raw)))
+    total_dict = best_of(lambda: sum(
+        int(b["seats"]) for u in dicts.values() for b in u["bookings"]))
+    total_rec = best_of(lambda: sum(
+        b.seats for u in recs.values() for b in u.bookings))
+    print(f"bookings: {n}")
+    print(f"dict   : {dict_bytes / n:>7.0f} B/booking, "
+          f"seat total {total_dict * 1000:.1f} ms")
+    print(f"record : {rec_bytes / n:>7.0f} B/booking, "
+          f"seat total {total_rec * 1000:.1f} ms")
+
+
+def _routing_dispatcher(buttons, table):
+    from aiogram import Dispatcher, F, Router
+    from menu import MenuRouter
+
+    async def handler(message, state):
+        return None
+
+    router = MenuRouter() if table else Router()
+    for text in buttons:
+        if table:
+            router.button(text)(handler)
+        else:
+            router.message.register(handler, F.text == text)
+    dp = Dispatcher()
+    if table:
+        dp.include_router(router.menu)
+    dp.include_router(router)
+    return dp
+
+
+def bench_routing(updates=2000):
+    """Ціна маршрутизації одного оновлення: ланцюжок F.text == ... проти
+    таблиці MenuRouter. Натискається остання кнопка — найгірший випадок
+    для ланцюжка."""
+    import asyncio
+    from aiogram import Bot
+    from aiogram.types import Update
+    from offline import OfflineSession
+
+    bot = Bot("1:offline", session=OfflineSession())
+    user = {"id": 1, "is_bot": False, "first_name": "U"}
+
+    def update(i, text):
+        return Update.model_validate({
+            "update_id": i,
+            "message": {
+                "message_id": i,
+                "date": 0,
+                "chat": {"id": 1, "type": "private"},
+                "from": user,
+                "text": text
+            }
+        })
+
+    async def run(dp, ups):
+        for u in ups:
+            await dp.feed_update(bot, u)
+
+    print(f"{'buttons':>7} {'chain us':>9} {'table us':>9} {'x':>6}")
+    for n in (10, 50, 100, 200):
+        buttons = [f"Кнопка {i}" for i in range(n)]
+        ups = [update(i, buttons[-1]) for i in range(updates)]
+        chain = _routing_dispatcher(buttons, table=False)
+        table = _routing_dispatcher(buttons, table=True)
+        t_chain = best_of(lambda: asyncio.run(run(chain, ups)), 3)
+        t_table = best_of(lambda: asyncio.run(run(table, ups)), 3)
+        print(f"{n:>7} {t_chain / updates * 1e6:>9.1f} "
+              f"{t_table / updates * 1e6:>9.1f} {t_chain / t_table:>6.1f}")
+
+
+def bench_analytics(users=5000):
+    """Звіт про завантаженість за 90 днів: пряме сканування бронювань
+    проти колонок analytics.Occupancy (холодний і теплий виклик)."""
+    import os
+    import tempfile
+    import partitions
+    from analytics import Occupancy
+    from handlers.common import base_times_for
+    from records import Booking
+    from store import get_store
+    from trips import trip_index
+
+    os.chdir(tempfile.mkdtemp(prefix="bench-"))
+    get_store().save("bookings", synthetic_bookings(users))
+    start, end = date(2025, 1, 1), date(2025, 3, 31)
+
+    def scan():
+        slots = {}
+        for info in get_store().load("bookings", {}).values():
+            for raw in info["bookings"]:
+                b = Booking.from_dict(raw)
+                if start.toordinal() <= b.day <= end.toordinal():
+                    key = (b.direction, b.minute)
+                    slots[key] = slots.get(key, 0) + b.seats
+        return slots
+
+    occ = Occupancy()
+    t_scan = best_of(scan, 3)
+    trip_index.fresh()  # у боті індекс прогріває app.preload
+    t0 = time.perf_counter()
+    occ.report(start, end, base_times_for)
+    t_cold = time.perf_counter() - t0
+    t_warm = best_of(lambda: occ.report(start, end, base_times_for))
+
+    def booked():
+        """Звіт після одного бронювання: латається лише його рейс."""
+        raw = dict(synthetic_bookings(1, 1, seed=time.time_ns())["100000000"]
+                   ["bookings"][0], date="2025-02-01")
+        with partitions.user_tx("1") as user:
+            base = trip_index.fresh().version
+            user["bookings"].append(raw)
+        trip_index.applied(base, added=[("1", Booking.from_dict(raw))])
+        t0 = time.perf_counter()
+        occ.report(start, end, base_times_for)
+        return time.perf_counter() - t0
+
+    t_patch = min(booked() for _ in range(5))
+    print(f"trips: {sum(len(b) for b in occ.buckets.values())}")
+    print(f"scan bookings : {t_scan * 1000:>8.1f} ms")
+    print(f"rollup (cold) : {t_cold * 1000:>8.1f} ms")
+    print(f"rollup (warm) : {t_warm * 1000:>8.1f} ms "
+          f"x{t_scan / t_warm:.0f}")
+    print(f"rollup (+1)   : {t_patch * 1000:>8.1f} ms "
+          f"x{t_scan / t_patch:.0f}")
+
+
+def bench_partitions(users=5000):
+    """Бронювання одного пасажира і оновлення індексу рейсів після запису
+    іншого процесу: один документ проти частин по днях (partitions)."""
+    import os
+    import tempfile
+    import partitions
+    from store import JsonStore, get_store
+    from trips import TripIndex
+
+    data = synthetic_bookings(users)
+    uid = next(iter(data))
+    booking = dict(data[uid]["bookings"][0], time="21:30")
+    print(f"{'layout':<8} {'write':>9} {'refresh':>9}")
+    for layout in ("single", "daily"):
+        os.chdir(tempfile.mkdtemp(prefix="bench-"))
+        partitions.LAYOUT = layout
+        get_store().save("bookings", data)
+        partitions.migrate()
+        other = JsonStore()  # інший процес: зміни бачимо за mtime файлів
+        index = TripIndex().fresh()
+
+        def write(store=None):
+            with partitions.user_tx(uid, store) as user:
+                user["bookings"].append(booking)
+
+        t_write = best_of(write)
+        t_refresh = float("inf")
+        for _ in range(5):
+            write(other)
+            t0 = time.perf_counter()
+            index.fresh()
+            t_refresh = min(t_refresh, time.perf_counter() - t0)
+        print(f"{layout:<8} {t_write * 1000:>6.1f} ms "
+              f"{t_refresh * 1000:>6.1f} ms")
+
+
+BENCHES = {
+    "json": bench_json,
+    "records": bench_records,
+    "routing": bench_routing,
+    "analytics": bench_analytics,
+    "partitions": bench_partitions
+}
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHES:
+        print(f"Використання: python bench.py {'|'.join(BENCHES)} [ARGS]")
+        sys.exit(2)
+    BENCHES[sys.argv[1]](*map(int, sys.argv[2:]))
@@ -0,0 +1,86 @@
+"""Розсилка одного повідомлення багатьом користувачам.
+
+Надсилання йдуть паралельно (не більше BROADCAST_CONCURRENCY одночасно),
+але стартують не частіше за BROADCAST_RATE на секунду — спільно для всіх
+розсилок процесу, бо ліміт Telegram діє на бота, а не на розсилку. На
+RetryAfter пауза ставиться для всіх, і повідомлення надсилається знову.
+
+    result = await broadcast(bot, chat_ids, "Рейс затримується")
+    result.sent, result.failed  # [chat_id], {chat_id: причина}
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+from aiogram.exceptions import (TelegramAPIError, TelegramForbiddenError,
+                                TelegramRetryAfter)
+
+from config import BROADCAST_CONCURRENCY, BROADCAST_RATE
+
+RETRIES = 3
+
+
+class Pacer:
+    """Видає слоти для надсилання з рівним інтервалом 1 / rate."""
+
+    def __init__(self, rate=BROADCAST_RATE, clock=time.monotonic):
+        self.interval = 1 / rate
+        self.clock = clock
+        self.next = 0.0
+
+    async def wait(self):
+        now = self.clock()
+        slot = max(now, self.next)
+        self.next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def pause(self, seconds):
+        self.next = max(self.next, self.clock() + seconds)
+
+
+pacer = Pacer()
+
+
+@dataclass(slots=True)
+class Delivery:
+    sent: list = field(default_factory=list)
+    failed: dict = field(default_factory=dict)  # chat_id -> причина
+    retried: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return len(self.sent) + len(self.failed)
+
+
+async def _send(bot, chat_id, text, limit, result):
+    async with limit:
+        for attempt in range(RETRIES + 1):
+            await pacer.wait()
+            try:
+                await bot.send_message(chat_id, text)
+            except TelegramRetryAfter as e:
+                pacer.pause(e.retry_after)
+                result.retried += 1
+                if attempt == RETRIES:
+                    result.failed[chat_id] = "flood"
+                continue
+            except TelegramForbiddenError:
+                result.failed[chat_id] = "blocked"
+            except TelegramAPIError as e:
+                result.failed[chat_id] = e.message
+            else:
+                result.sent.append(chat_id)
+            return
+
+
+async def broadcast(bot, chat_ids, text,
+                    concurrency=BROADCAST_CONCURRENCY) -> Delivery:
+    result = Delivery()
+    limit = asyncio.Semaphore(concurrency)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_send(bot, int(c), text, limit, result)
+                           for c in dict.fromkeys(chat_ids)))
+    result.elapsed = time.perf_counter() - t0
+    return result
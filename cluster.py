@@ -0,0 +1,224 @@
+"""Кілька процесів-воркерів зі спільним SQLite-сховищем і FSM.
+
+Координатор отримує оновлення (getUpdates) і розкладає їх по воркерах за
+chat_id, тож розмова одного користувача завжди обробляється одним
+воркером і по черзі. Бронювання та FSM-стан лежать у SQLITE_PATH.
+
+    python cluster.py 4               # координатор + 4 воркери
+    python cluster.py --selfcheck 4   # локальна перевірка без Telegram
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+log = logging.getLogger("cluster")
+
+
+def update_chat_id(update: dict) -> int:
+    """Ключ шардування: чат повідомлення, інакше автор оновлення."""
+    for kind, body in update.items():
+        if not isinstance(body, dict):
+            continue
+        if "chat" in body:
+            return body["chat"]["id"]
+        msg = body.get("message")
+        if isinstance(msg, dict) and "chat" in msg:
+            return msg["chat"]["id"]
+        if "from" in body:
+            return body["from"]["id"]
+    return update.get("update_id", 0)
+
+
+def shard_of(update: dict, workers: int) -> int:
+    return update_chat_id(update) % workers
+
+
+# ====================== WORKER ======================
+async def _after(prev, coro):
+    if prev is not None:
+        await asyncio.wait([prev])
+    try:
+        await coro
+    except Exception:
+        log.exception("Помилка обробки оновлення")
+
+
+async def _consume(dp, bot, queue, ready):
+    loop = asyncio.get_running_loop()
+    # фаза старту (app.preload) — до того, як координатор почне слати оновлення
+    await dp.emit_startup(bot=bot, dispatcher=dp)
+    ready.release()
+    tails = {}  # chat_id -> остання задача цього чату
+    while True:
+        update = await loop.run_in_executor(None, queue.get)
+        if update is None:
+            break
+        chat = update_chat_id(update)
+        task = asyncio.create_task(
+            _after(tails.get(chat), dp.feed_raw_update(bot, update)))
+        tails[chat] = task
+        task.add_done_callback(
+            lambda t, c=chat: tails.get(c) is t and tails.pop(c))
+    if tails:
+        await asyncio.wait(list(tails.values()))
+
+
+def worker_main(queue, ready, offline=False):
+    from app import create_bot, create_dispatcher
+    from offline import OfflineSession
+
+    dp = create_dispatcher(background=False)  # фонові задачі — координатора
+    tg = create_bot(session=OfflineSession() if offline else None)
+    asyncio.run(_consume(dp, tg, queue, ready))
+
+
+# ====================== COORDINATOR ======================
+def _spawn(workers, offline=False):
+    os.environ["STORAGE_BACKEND"] = "sqlite"
+    os.environ["FSM_STORAGE"] = "sqlite"
+    ctx = multiprocessing.get_context("spawn")
+    queues = [ctx.Queue() for _ in range(workers)]
+    ready = ctx.Semaphore(0)
+    procs = [
+        ctx.Process(target=worker_main, args=(q, ready, offline), daemon=True)
+        for q in queues
+    ]
+    for p in procs:
+        p.start()
+    for _ in procs:
+        ready.acquire()
+    return queues, procs
+
+
+def _stop(queues, procs):
+    for q in queues:
+        q.put(None)
+    for p in procs:
+        p.join()
+
+
+async def _poll(queues):
+    import api
+    import backup
+    import manifests
+    import recurring
+    from app import create_bot
+
+    tg = create_bot()
+    offset = None
+    await backup.start()
+    await recurring.start()
+    await manifests.start(tg)
+    await api.start()
+    try:
+        while True:
+            updates = await tg.get_updates(offset=offset, timeout=30)
+            for u in updates:
+                raw = u.model_dump(mode="json", by_alias=True,
+                                   exclude_none=True)
+                queues[shard_of(raw, len(queues))].put(raw)
+                offset = u.update_id + 1
+    finally:
+        await backup.stop()
+        await recurring.stop()
+        await manifests.stop()
+        await api.stop()
+        await tg.session.close()
+
+
+def run(workers):
+    queues, procs = _spawn(workers)
+    try:
+        asyncio.run(_poll(queues))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        _stop(queues, procs)
+
+
+# ====================== SELF-CHECK ======================
+def _conversation(uid, update_ids):
+    day = str(datetime.now().date() + timedelta(days=1))
+    texts = [
+        "/start", "🚐 Забронювати місце", "1", day, "🚐 Київ → Рокитне",
+        "✅ 15:00", "Автостанція Південна", None
+    ]
+    user = {"id": uid, "is_bot": False, "first_name": f"U{uid}"}
+    for text in texts:
+        msg = {
+            "message_id": next(update_ids),
+            "date": int(time.time()),
+            "chat": {
+                "id": uid,
+                "type": "private"
+            },
+            "from": user,
+        }
+        if text is None:
+            msg["contact"] = {
+                "phone_number": f"380{uid}",
+                "first_name": user["first_name"],
+                "user_id": uid
+            }
+        else:
+            msg["text"] = text
+        yield {"update_id": msg["message_id"], "message": msg}
+
+
+def selfcheck(workers, users=200):
+    import itertools
+    import partitions
+    from store import DEFAULTS, SqliteStore
+
+    tmp = tempfile.mkdtemp(prefix="cluster-")
+    os.environ["THROTTLE"] = "0"  # розмови подаються без пауз
+    os.environ["SQLITE_PATH"] = os.path.join(tmp, "bot.sqlite3")
+    db = SqliteStore(os.environ["SQLITE_PATH"], seed_root=tmp)
+    for name, default in DEFAULTS.items():
+        db.save(name, default)
+
+    ids = itertools.count(1)
+    convs = [list(_conversation(10**6 + i, ids)) for i in range(users)]
+    # перемішуємо розмови: крок 1 усіх, крок 2 усіх, ...
+    stream = [u for step in zip(*convs) for u in step]
+
+    queues, procs = _spawn(workers, offline=True)
+    t0 = time.perf_counter()
+    for u in stream:
+        queues[shard_of(u, workers)].put(u)
+    _stop(queues, procs)
+    elapsed = time.perf_counter() - t0
+
+    from config import TRIP_CAPACITY
+
+    # рейс один, тож понад TRIP_CAPACITY пасажири потрапляють у чергу —
+    # це теж прийняте бронювання; перевіряємо, що рейс не переповнено
+    data = partitions.load_all(db)
+    queued = [e["uid"] for q in db.load("waitlist", {}).values() for e in q]
+    per_user = [
+        len(data.get(str(10**6 + i), {}).get("bookings", [])) +
+        queued.count(str(10**6 + i)) for i in range(users)
+    ]
+    booked = sum(
+        int(b["seats"]) for u in data.values() for b in u["bookings"])
+    lost = per_user.count(0)
+    dup = sum(1 for n in per_user if n > 1)
+    print(f"workers={workers} users={users} updates={len(stream)} "
+          f"{len(stream) / elapsed:.0f} upd/s")
+    print(f"booked={booked}/{TRIP_CAPACITY} waitlisted={len(queued)} "
+          f"lost={lost} duplicated={dup}")
+    ok = lost == 0 and dup == 0 and booked <= TRIP_CAPACITY
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    args = sys.argv[1:]
+    if args and args[0] == "--selfcheck":
+        sys.exit(selfcheck(int(args[1]) if len(args) > 1 else 4))
+    run(int(args[0]) if args else os.cpu_count() or 2)
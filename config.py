@@ -1,4 +1,52 @@
-BOT_TOKEN = "8488165903:AAEsvNkU2ooYI6x1WnmpaGSqn1fZVjdmK38"
+import os
+
+# токен краще задавати змінною середовища BOT_TOKEN (Secrets у Replit)
+BOT_TOKEN = os.getenv("BOT_TOKEN",
+                      "8488165903:AAEsvNkU2ooYI6x1WnmpaGSqn1fZVjdmK38")
 
 ADMINS = [864815230]  # твоє ID як адміністратора
 DRIVERS = []  # тут можна додавати ID водіїв
+
+# ---- JSON-сховища ----
+JSON_BACKEND = "auto"  # "auto" (orjson, якщо встановлено), "orjson" або "json"
+JSON_COMPACT = True  # компактний формат для файлів, які веде сам бот
+
+# ---- Сховище даних ----
+# "json" — файли поруч із ботом (один процес);
+# "sqlite" — спільна БД для кількох процесів (python cluster.py N)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json")
+SQLITE_PATH = os.getenv("SQLITE_PATH", "bot.sqlite3")
+FSM_STORAGE = os.getenv("FSM_STORAGE", "memory")  # "memory" або "sqlite"
+# "single" — усі бронювання в одному документі; "daily" — частина на кожен
+# день відправлення (python partitions.py stats|archive)
+BOOKINGS_LAYOUT = os.getenv("BOOKINGS_LAYOUT", "single")
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")  # архів минулих днів
+
+# ---- Знімки сховища (python backup.py list|restore) ----
+BACKUP_DIR = os.getenv("BACKUP_DIR", "backups")
+BACKUP_INTERVAL = int(os.getenv("BACKUP_INTERVAL", "3600"))  # сек; 0 — вимкнено
+BACKUP_KEEP = 48  # скільки останніх знімків тримати
+
+# ---- Захист від спаму ----
+THROTTLE = os.getenv("THROTTLE", "1") == "1"  # 0 — вимкнено (навантажувальні тести)
+THROTTLE_RATE = 1.0  # запитів на секунду на користувача (у середньому)
+THROTTLE_BURST = 5  # скільки запитів поспіль дозволено одразу
+THROTTLE_IDLE_TTL = 600  # сек; неактивних користувачів забуваємо
+CALLBACK_DEDUP_WINDOW = 1.0  # сек; однакові натискання кнопки ігноруємо
+
+# ---- Рейси ----
+TRIP_CAPACITY = 18  # місць у бусі; коли зайнято — пасажири стають у чергу
+# сек; як часто бронювати регулярні поїздки; 0 — ні
+RECURRING_INTERVAL = int(os.getenv("RECURRING_INTERVAL", "3600"))
+INLINE_CACHE_TIME = 10  # сек; скільки Telegram тримає відповідь inline-пошуку
+# сек; зміни рейсу за цей час — одне редагування живого маніфесту водія
+MANIFEST_DEBOUNCE = 3
+
+# ---- HTTP API для диспетчерів (лише читання, див. api.py) ----
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "0"))  # 0 — вимкнено
+API_TOKEN = os.getenv("API_TOKEN", "")  # "" — без авторизації
+
+# ---- Розсилки пасажирам рейсу ----
+BROADCAST_CONCURRENCY = 8  # одночасних надсилань
+BROADCAST_RATE = 25  # повідомлень на секунду (ліміт Telegram — ~30)
@@ -0,0 +1,13 @@
+"""Обробники бота, розбиті на роутери за ролями.
+
+Порядок підключення важливий: спершу кнопки меню всіх ролей (у т.ч.
+"❌ Відмінити" і "🏠 Повернутись в головне меню") — вони працюють у
+будь-якому стані, хоч би чий діалог був незакінчений; далі стани
+й callback'и пасажира, водія, адміністратора. Inline-пошук
+(handlers.inline) ловить лише inline-запити і свої callback'и, тож його
+місце в ланцюжку не важливе.
+"""
+from handlers import admin, driver, inline, passenger
+
+routers = (passenger.router.menu, driver.router.menu, admin.router.menu,
+           passenger.router, inline.router, driver.router, admin.router)
@@ -0,0 +1,397 @@
+"""Адміністратор: водії, адміністратори, призначення водіїв на рейси,
+звіт про завантаженість. Доступ перевіряє RoleMiddleware роутера."""
+import re
+from datetime import datetime, timedelta
+from aiogram import types, F
+from aiogram.types import (ReplyKeyboardMarkup, KeyboardButton,
+                           InlineKeyboardMarkup, InlineKeyboardButton,
+                           CallbackQuery)
+from aiogram.fsm.context import FSMContext
+from analytics import occupancy
+from menu import MenuRouter
+from middlewares import RoleMiddleware
+from store import get_store
+from trips import trip_key
+from handlers.common import (AdminAdminStates, DriverMgmtStates, RoutesStates,
+                             base_times_for, driver_dates_minus3_plus7,
+                             driver_label, drivers_list, find_driver_by_id,
+                             is_admin, load_admins, main_menu, rows_of,
+                             save_admins, save_drivers)
+
+router = MenuRouter(name="admin")
+_only_admins = RoleMiddleware(is_admin, "⛔ Доступ лише для адміністраторів.")
+router.message.middleware(_only_admins)
+router.callback_query.middleware(_only_admins)
+router.menu.message.middleware(_only_admins)
+
+
+# ---- Керування водіями (лише адміни) ----
+@router.button("👨‍✈️ Керування водіями")
+async def manage_drivers_menu(msg: types.Message, state: FSMContext):
+    lst = drivers_list()
+    text = "👨‍✈️ <b>Поточні водії:</b>\n" + ("\n".join(
+        [f"• {driver_label(x)}" for x in lst]) if lst else "Немає")
+    kb = ReplyKeyboardMarkup(keyboard=[[
+        KeyboardButton(text="➕ Додати водія"),
+        KeyboardButton(text="➖ Видалити водія")
+    ], [KeyboardButton(text="🏠 Повернутись в головне меню")]],
+                             resize_keyboard=True)
+    await msg.answer(text, parse_mode="HTML", reply_markup=kb)
+    await state.set_state(DriverMgmtStates.waiting_for_action)
+
+
+@router.message(DriverMgmtStates.waiting_for_action, F.text == "➕ Додати водія")
+async def add_driver_start(msg: types.Message, state: FSMContext):
+    await msg.answer(
+        "Надішліть у форматі:\n<id> <Ім’я (може бути з пробілами)> <Телефон>\n\nПриклад:\n123456789 Іван Петров +380501112233\nАБО перешліть повідомлення користувача, щоб підставити ID."
+    )
+    await state.set_state(DriverMgmtStates.waiting_for_new_driver)
+
+
+@router.message(DriverMgmtStates.waiting_for_new_driver, F.forward_from)
+async def add_driver_by_forward(msg: types.Message, state: FSMContext):
+    new_id = msg.forward_from.id
+    d = {"drivers": drivers_list()}
+    if any(x["id"] == new_id for x in d["drivers"]):
+        await msg.answer("Цей користувач уже є водієм.")
+    else:
+        d["drivers"].append({"id": new_id, "name": "Без імені", "phone": "—"})
+        save_drivers(d)
+        await msg.answer(f"✅ Додано водія: {new_id}")
+    await state.clear()
+    await msg.answer("Готово.", reply_markup=main_menu(msg.from_user.id))
+
+
+@router.message(DriverMgmtStates.waiting_for_new_driver)
+async def add_driver_by_text(msg: types.Message, state: FSMContext):
+    parts = msg.text.strip().split()
+    try:
+        new_id = int(parts[0])
+    except:
+        await msg.answer("❌ Перше значення має бути числовим ID.")
+        return
+    phone = "—"
+    if len(parts) >= 2:
+        last = parts[-1]
+        if last.startswith("+") or last.replace("+", "").replace("-",
+                                                                 "").isdigit():
+            phone = last
+            name_tokens = parts[1:-1]
+        else:
+            name_tokens = parts[1:]
+    else:
+        name_tokens = []
+    name = " ".join(name_tokens).strip() or "Без імені"
+
+    d = {"drivers": drivers_list()}
+    if any(x["id"] == new_id for x in d["drivers"]):
+        await msg.answer("Цей користувач уже є водієм.")
+    else:
+        d["drivers"].append({"id": new_id, "name": name, "phone": phone})
+        save_drivers(d)
+        await msg.answer(f"✅ Додано водія:\nID: {new_id}\n👤 {name}\n📞 {phone}")
+    await state.clear()
+    await msg.answer("Готово.", reply_markup=main_menu(msg.from_user.id))
+
+
+@router.message(DriverMgmtStates.waiting_for_action, F.text == "➖ Видалити водія")
+async def remove_driver_start(msg: types.Message, state: FSMContext):
+    await msg.answer("Введіть ID водія, якого потрібно видалити:")
+    await state.set_state(DriverMgmtStates.waiting_for_remove_driver)
+
+
+@router.message(DriverMgmtStates.waiting_for_remove_driver)
+async def remove_driver(msg: types.Message, state: FSMContext):
+    try:
+        rid = int(msg.text.strip())
+    except:
+        await msg.answer("❌ Введіть числовий ID.")
+        return
+    d = {"drivers": [x for x in drivers_list() if x["id"] != rid]}
+    save_drivers(d)
+    await msg.answer(f"🗑 Якщо водій існував — видалено ID {rid}.")
+    await state.clear()
+    await msg.answer("Готово.", reply_markup=main_menu(msg.from_user.id))
+
+
+# ---- Керування адміністраторами ----
+@router.button("🛠 Керування адміністраторами")
+async def manage_admins_menu(msg: types.Message, state: FSMContext):
+    a = load_admins()
+    lst = a.get("admins", [])
+    text = "👑 <b>Поточні адміністратори:</b>\n" + ("\n".join(
+        [f"• {x}" for x in lst]) if lst else "Немає")
+    kb = ReplyKeyboardMarkup(keyboard=[[
+        KeyboardButton(text="➕ Додати адміністратора"),
+        KeyboardButton(text="➖ Видалити адміністратора")
+    ], [KeyboardButton(text="🏠 Повернутись в головне меню")]],
+                             resize_keyboard=True)
+    await msg.answer(text, parse_mode="HTML", reply_markup=kb)
+    await state.set_state(AdminAdminStates.menu)
+
+
+@router.message(AdminAdminStates.menu,
+                F.text == "➕ Додати адміністратора")
+async def add_admin_prompt(msg: types.Message, state: FSMContext):
+    await msg.answer(
+        "Надішліть ID користувача (числом) або перешліть його повідомлення."
+    )
+    await state.set_state(AdminAdminStates.add_admin_wait)
+
+# 1) Додаємо адміністраторa через пересилання
+@router.message(F.forward_from, AdminAdminStates.add_admin_wait)
+async def add_admin_by_forward(msg: types.Message, state: FSMContext):
+    new_id = msg.forward_from.id
+    a = load_admins()
+    exists = any(x.get("id") == new_id for x in a.get("admins", []))
+    if exists:
+        await msg.answer("❗ Цей користувач уже адміністратор.")
+        await state.clear()
+        await msg.answer("Готово ✅", reply_markup=main_menu(msg.from_user.id))
+        return
+
+    # зберігаємо тимчасово ID і просимо ім’я/телефон
+    await state.update_data(new_admin_id=new_id)
+    await msg.answer(
+        "✏️ Введіть ім’я та номер телефону адміністратора у форматі:\n"
+        "👉 «Ім’я Прізвище +380XXXXXXXXX»",
+        parse_mode="Markdown"
+    )
+    await state.set_state(AdminAdminStates.add_admin_info)
+
+# 2) Додаємо адміністраторa через введений ID
+@router.message(AdminAdminStates.add_admin_wait)
+async def add_admin_by_id(msg: types.Message, state: FSMContext):
+    try:
+        new_id = int(msg.text.strip())
+    except ValueError:
+        await msg.answer("❌ Введіть числовий ID.")
+        return
+
+    a = load_admins()
+    exists = any(x.get("id") == new_id for x in a.get("admins", []))
+    if exists:
+        await msg.answer("❗ Цей користувач уже адміністратор.")
+        await state.clear()
+        await msg.answer("Готово ✅", reply_markup=main_menu(msg.from_user.id))
+        return
+
+    # зберігаємо тимчасово ID і просимо ім’я/телефон
+    await state.update_data(new_admin_id=new_id)
+    await msg.answer(
+        "✏️ Введіть ім’я та номер телефону адміністратора у форматі:\n"
+        "👉 «Ім’я Прізвище +380XXXXXXXXX»",
+        parse_mode="Markdown"
+    )
+    await state.set_state(AdminAdminStates.add_admin_info)
+
+# 3) Приймаємо «Ім’я Прізвище +380ХХХ…», зберігаємо у файл
+@router.message(AdminAdminStates.add_admin_info)
+async def add_admin_save_info(msg: types.Message, state: FSMContext):
+    data = await state.get_data()
+    new_id = data.get("new_admin_id")
+
+    parts = msg.text.strip().split()
+    if len(parts) < 2:
+        await msg.answer(
+            "❌ Формат неправильний. Приклад:\n"
+            "Іван Петренко +380501112233",
+            parse_mode="Markdown"
+        )
+        return
+
+    phone = parts[-1] if parts[-1].startswith("+") else "—"
+    name = " ".join(parts[:-1]).strip() if phone != "—" else " ".join(parts).strip()
+
+    a = load_admins()
+    a.setdefault("admins", []).append({"id": new_id, "name": name, "phone": phone})
+    save_admins(a)
+
+    await msg.answer(f"✅ Додано адміністратора:\n👤 {name}\n📞 {phone}\n🆔 {new_id}")
+    await state.clear()
+    await msg.answer("Готово ✅", reply_markup=main_menu(msg.from_user.id))
+
+
+@router.message(AdminAdminStates.menu,
+                F.text == "➖ Видалити адміністратора")
+async def remove_admin_prompt(msg: types.Message, state: FSMContext):
+    await msg.answer("Введіть ID адміністратора, якого потрібно видалити:")
+    await state.set_state(AdminAdminStates.remove_admin_wait)
+
+
+@router.message(AdminAdminStates.remove_admin_wait)
+async def remove_admin(msg: types.Message, state: FSMContext):
+    try:
+        rid = int(msg.text.strip())
+        a = load_admins()
+        admins_list = a.get("admins", [])
+        target = next((x for x in admins_list if x.get("id") == rid), None)
+
+        if target:
+            a["admins"] = [x for x in admins_list if x.get("id") != rid]
+            save_admins(a)
+            await msg.answer(f"🗑 Видалено адміністратора: {rid}")
+        else:
+            await msg.answer("Такого адміністратора немає.")
+    except:
+        await msg.answer("❌ Невірний формат ID.")
+    await state.clear()
+
+
+# ---- Керування рейсами (призначення водіїв) ----
+@router.button("📅 Керування рейсами")
+async def routes_manage_entry(msg: types.Message, state: FSMContext):
+    dates = driver_dates_minus3_plus7()
+    kb = [[KeyboardButton(text=str(d))] for d in dates]
+    kb.append([KeyboardButton(text="🏠 Повернутись в головне меню")])
+    await msg.answer("Оберіть дату рейсу:",
+                     reply_markup=ReplyKeyboardMarkup(keyboard=kb,
+                                                      resize_keyboard=True))
+    await state.set_state(RoutesStates.pick_date)
+
+
+@router.message(RoutesStates.pick_date)
+async def routes_pick_direction(msg: types.Message, state: FSMContext):
+    try:
+        sel_date = datetime.strptime(msg.text, "%Y-%m-%d").date()
+    except:
+        await msg.answer("Оберіть дату з кнопок.")
+        return
+    await state.update_data(date=str(sel_date))
+    kb = ReplyKeyboardMarkup(
+        keyboard=[[KeyboardButton(text="🚐 Київ → Рокитне")],
+                  [KeyboardButton(text="🚌 Рокитне → Київ")],
+                  [KeyboardButton(text="🏠 Повернутись в головне меню")]],
+        resize_keyboard=True)
+    await msg.answer("Оберіть напрямок:", reply_markup=kb)
+    await state.set_state(RoutesStates.pick_direction)
+
+
+@router.message(RoutesStates.pick_direction)
+async def routes_pick_time(msg: types.Message, state: FSMContext):
+    direction = msg.text
+    await state.update_data(direction=direction)
+    times = base_times_for(direction)
+    kb = rows_of([KeyboardButton(text=t) for t in times], 3)
+    kb.append([KeyboardButton(text="🏠 Повернутись в головне меню")])
+    await msg.answer("Оберіть час:",
+                     reply_markup=ReplyKeyboardMarkup(keyboard=kb,
+                                                      resize_keyboard=True))
+    await state.set_state(RoutesStates.pick_time)
+
+
+@router.message(RoutesStates.pick_time)
+async def routes_pick_driver(msg: types.Message, state: FSMContext):
+    time_str = msg.text
+    await state.update_data(time=time_str)
+
+    lst = drivers_list()
+    if not lst:
+        await msg.answer(
+            "Немає доданих водіїв. Додайте у «👨‍✈️ Керування водіями».")
+        await state.clear()
+        return
+
+    # показуємо "id — Ім'я (телефон)"; парсимо перше число
+    labels = [driver_label(d) for d in lst]
+    kb = rows_of([KeyboardButton(text=lbl) for lbl in labels], 1)
+    kb.append([KeyboardButton(text="🏠 Повернутись в головне меню")])
+    await msg.answer("Вкажіть водія (натисніть кнопку):",
+                     reply_markup=ReplyKeyboardMarkup(keyboard=kb,
+                                                      resize_keyboard=True))
+    await state.set_state(RoutesStates.pick_driver)
+
+
+@router.message(RoutesStates.pick_driver)
+async def routes_assign_driver(msg: types.Message, state: FSMContext):
+    m = re.match(r"^\s*(\d+)", msg.text.strip())
+    if not m:
+        await msg.answer("Введіть або виберіть кнопку із ID водія.")
+        return
+    driver_id = int(m.group(1))
+    # ✅ дозволяємо також адміністраторам призначати себе
+    if not find_driver_by_id(driver_id):
+        if driver_id == msg.from_user.id and is_admin(msg.from_user.id):
+            pass  # адмін може сам себе призначити
+        else:
+            await msg.answer("Це не ID водія зі списку.")
+            return
+
+    ud = await state.get_data()
+    date_str, time_str, direction = ud["date"], ud["time"], ud["direction"]
+
+    key = trip_key(date_str, time_str, direction)
+    with get_store().transaction("routes", {}) as routes:
+        routes[key] = {
+            "driver_id": driver_id,
+            "date": date_str,
+            "time": time_str,
+            "direction": direction
+        }
+
+    await state.clear()
+    drv = find_driver_by_id(driver_id)
+    await msg.answer(
+        f"✅ Водія призначено:\n"
+        f"👤 {drv['name']} ({drv['phone']})\n"
+        f"📅 {date_str} | 🕒 {time_str} | {direction}",
+        reply_markup=main_menu(msg.from_user.id))
+
+
+# ---- Завантаженість рейсів ----
+OCCUPANCY_PERIODS = (7, 30, 90)
+WEEKDAYS = ("Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Нд")
+
+
+def occupancy_text(days: int) -> str:
+    end = datetime.now().date()
+    start = end - timedelta(days=days - 1)
+    rep = occupancy.report(start, end, base_times_for)
+    lines = [
+        f"📊 Завантаженість {start} — {end} ({days} дн.)",
+        f"Рейсів: {rep['departures']} | зайнято місць: {rep['seats']}"
+    ]
+    direction = None
+    for (d, minute), (ratio, full, empty, trips) in rep["slots"].items():
+        if d != direction:
+            direction = d
+            lines.append(f"\n{d}")
+        lines.append(f"{minute // 60:02d}:{minute % 60:02d}  {ratio:>4.0%}  "
+                     f"повних {full}, порожніх {empty} з {trips}")
+    lines.append("\nЗа днями тижня:")
+    for d in dict.fromkeys(d for d, _ in rep["weekdays"]):
+        week = " ".join(f"{WEEKDAYS[wd]} {rep['weekdays'][(d, wd)]:.0%}"
+                        for wd in range(7) if (d, wd) in rep["weekdays"])
+        lines.append(f"{d[0]} {week}")
+    if rep["drivers"]:
+        lines.append("\n👨‍✈️ Водії:")
+        for did, (trips, seats, ratio) in rep["drivers"].items():
+            drv = find_driver_by_id(did)
+            name = drv["name"] if drv else str(did)
+            lines.append(f"{name}: рейсів {trips}, місць {seats}, "
+                         f"завантаженість {ratio:.0%}")
+    return "\n".join(lines)
+
+
+def occupancy_kb(days: int) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[[
+        InlineKeyboardButton(text=f"{'• ' if n == days else ''}{n} дн.",
+                             callback_data=f"occ:{n}")
+        for n in OCCUPANCY_PERIODS
+    ]])
+
+
+@router.button("📊 Завантаженість")
+async def occupancy_report(msg: types.Message, state: FSMContext):
+    await msg.answer(occupancy_text(30), reply_markup=occupancy_kb(30))
+
+
+@router.callback_query(F.data.startswith("occ:"))
+async def occupancy_period_cb(call: CallbackQuery):
+    days = int(call.data.split(":", 1)[1])
+    if days not in OCCUPANCY_PERIODS:
+        await call.answer()
+        return
+    await call.message.edit_text(occupancy_text(days),
+                                 reply_markup=occupancy_kb(days))
+    await call.answer()
@@ -0,0 +1,399 @@
+"""Спільне для всіх роутерів: доступ до сховища, ролі, меню, розклад,
+стани FSM."""
+from datetime import datetime, timedelta
+from functools import lru_cache
+from aiogram import Bot, types
+from aiogram.types import (ReplyKeyboardMarkup, KeyboardButton,
+                           InlineKeyboardMarkup, InlineKeyboardButton)
+from aiogram.fsm.state import State, StatesGroup
+from config import ADMINS, TRIP_CAPACITY
+from partitions import day_tx, user_tx
+from phones import phone_index
+from store import get_store
+from records import Booking, minute_str, parse_minute
+from trips import (MIN_LEAD, departed, departure, has_room, lock_index,
+                   trip_id, trip_index, trip_key, waitlist)
+
+CANCEL_TEXT = "❌ Відмінити"
+
+# ====================== UTILS: STORE ======================
+# бронювання — через partitions: load_user/user_tx для одного пасажира,
+# day_tx для однієї дати
+
+
+def load_routes():
+    return get_store().load("routes", {})
+
+
+def save_routes(r):
+    get_store().save("routes", r)
+
+
+def load_admins():
+    data = get_store().load("admins", {"admins": []})
+    # автоматично оновлюємо старий формат (якщо просто ID)
+    admins = []
+    for a in data.get("admins", []):
+        if isinstance(a, int):
+            admins.append({"id": a, "name": "Без імені", "phone": "—"})
+        else:
+            admins.append({
+                "id": int(a.get("id")),
+                "name": a.get("name", "Без імені"),
+                "phone": a.get("phone", "—")
+            })
+    if admins != data.get("admins", []):
+        data["admins"] = admins
+        save_admins(data)
+    return data
+
+
+def save_admins(d):
+    get_store().save("admins", d)
+
+
+# ---- Функції блокування ----
+def lock_route(route_key):
+    lock_index.set(route_key, True)
+
+
+def unlock_route(route_key):
+    lock_index.set(route_key, False)
+
+
+def is_route_locked(route_key):
+    return lock_index.is_locked(route_key)
+
+
+# ---- Drivers helpers (+ авто-міграція старого формату [ids]) ----
+def _normalize_drivers(dr):
+    norm, changed = [], False
+    for x in dr:
+        if isinstance(x, dict):
+            norm.append({
+                "id": int(x.get("id")),
+                "name": (x.get("name") or "Без імені").strip(),
+                "phone": (x.get("phone") or "—").strip()
+            })
+        else:
+            norm.append({"id": int(x), "name": "Без імені", "phone": "—"})
+            changed = True
+    return norm, changed
+
+
+def load_drivers():
+    raw = get_store().load("drivers", {"drivers": []})
+    lst, changed = _normalize_drivers(raw.get("drivers", []))
+    if changed:
+        get_store().save("drivers", {"drivers": lst})
+    return {"drivers": lst}
+
+
+def save_drivers(d):
+    lst, _ = _normalize_drivers(d.get("drivers", []))
+    get_store().save("drivers", {"drivers": lst})
+
+
+def drivers_list():
+    return load_drivers().get("drivers", [])
+
+
+def find_driver_by_id(did: int):
+    for d in drivers_list():
+        if d["id"] == did:
+            return d
+    return None
+
+
+def driver_label(d: dict) -> str:
+    return f"{d['id']} — {d.get('name','Без імені')} ({d.get('phone','—')})"
+
+
+# ====================== ROLES & MENUS ======================
+class RoleIndex:
+    """Множини id адміністраторів і водіїв. Перевірка ролі — O(1) без
+    читання документів; перебудова — коли змінився admins або drivers."""
+
+    def __init__(self):
+        self.version = None
+        self.admins = set()
+        self.drivers = set()
+
+    def fresh(self):
+        store = get_store()
+        version = (store.version("admins"), store.version("drivers"))
+        if version != self.version:
+            admins, drivers = load_admins(), load_drivers()
+            # версію беремо після читання: міграція старого формату її змінює
+            self.prime(admins, drivers,
+                       (store.version("admins"), store.version("drivers")))
+        return self
+
+    def prime(self, admins, drivers, version):
+        self.admins = {a["id"] for a in admins.get("admins", [])}
+        self.admins.update(ADMINS)
+        self.drivers = {d["id"] for d in drivers.get("drivers", [])}
+        self.version = version
+
+
+roles = RoleIndex()
+
+
+def is_admin(uid: int) -> bool:
+    return uid in roles.fresh().admins
+
+
+def is_driver(uid: int) -> bool:
+    roles.fresh()
+    return uid in roles.drivers or uid in roles.admins
+
+
+@lru_cache(maxsize=None)
+def _menu(driver: bool) -> ReplyKeyboardMarkup:
+    rows = [[KeyboardButton(text="🚐 Забронювати місце")],
+            [KeyboardButton(text="📋 Мої бронювання")],
+            [KeyboardButton(text="🔁 Регулярні поїздки")]]
+    if driver:
+        rows.append([KeyboardButton(text="👨‍✈️ Адмін-панель")])
+    return ReplyKeyboardMarkup(keyboard=rows, resize_keyboard=True)
+
+
+def main_menu(uid: int) -> ReplyKeyboardMarkup:
+    return _menu(is_driver(uid))
+
+
+def rows_of(items, n=3):
+    return [items[i:i + n] for i in range(0, len(items), n)]
+
+
+# ====================== SCHEDULE HELPERS ======================
+def base_times_for(direction: str):
+    # Рокитне → Київ — частіше
+    if ("Рокитне" in direction) and ("→ Київ" in direction):
+        return [
+            "05:00", "05:30", "06:00", "07:00", "08:00", "09:00", "10:00",
+            "12:00", "13:00", "14:00", "15:00", "16:00", "17:00"
+        ]
+    # Київ → Рокитне — щогодини
+    return [f"{h:02d}:00" for h in range(8, 21)]
+
+
+def default_pickup(direction: str) -> str:
+    if "Рокитне" in direction and "→ Київ" in direction:
+        return "Біля автостанції"
+    return "Автостанція Південна"
+
+
+def user_dates_7days():
+    today = datetime.now().date()
+    return [(today + timedelta(days=i)) for i in range(7)]
+
+
+def driver_dates_minus3_plus7():
+    today = datetime.now().date()
+    return [(today - timedelta(days=i)) for i in range(3, 0, -1)] + \
+           [(today + timedelta(days=i)) for i in range(0, 8)]
+
+
+def filtered_times_for_user(direction: str, selected_date):
+    """Для користувача приховуємо рейси, що стартують менше ніж за 20 хв."""
+    now = datetime.now()
+    res = []
+    for t in base_times_for(direction):
+        h, m = map(int, t.split(":"))
+        dep = datetime.combine(selected_date, datetime.min.time()) + timedelta(
+            hours=h, minutes=m)
+        if dep > now + MIN_LEAD:
+            res.append(t)
+    return res
+
+
+def trip_bookings(date_str: str, time_str: str, direction: str):
+    """Усі бронювання рейсу як записи Booking, за часом створення."""
+    time_str = minute_str(parse_minute(time_str))
+    return trip_index.bookings(trip_key(date_str, time_str, direction))
+
+
+def move_booking(uid: str, src: str, dst: str) -> Booking:
+    """Переносить бронювання uid з рейсу src на рейс dst одним записом
+    сховища. ValueError з поясненням — якщо перенести не можна."""
+    with user_tx(uid) as user:
+        base = trip_index.fresh().version
+        bookings = user["bookings"]
+        parsed = []
+        for raw in bookings:
+            try:
+                parsed.append(Booking.from_dict(raw))
+            except (KeyError, TypeError, ValueError):
+                parsed.append(None)
+        keys = [b and trip_key(b.date, b.time, b.direction) for b in parsed]
+        if src not in keys:
+            raise ValueError("Бронювання не знайдено.")
+        if dst in keys:
+            raise ValueError("У вас уже є бронювання на цей рейс.")
+        i = keys.index(src)
+        old = parsed[i]
+        # клавіатура могла застаріти: рейс уже відправився або от-от
+        now = datetime.now()
+        if old.departure <= now:
+            raise ValueError("🚫 Цей рейс уже відправився.")
+        try:
+            closed = departure(dst) <= now + MIN_LEAD
+        except ValueError:
+            closed = True
+        if closed:
+            raise ValueError("🚫 Бронювання на цей рейс уже закрито.")
+        if not has_room(dst, old.seats):
+            raise ValueError("🚫 На цей рейс місць немає.")
+        date_str, time_str, direction = dst.split(" ", 2)
+        bookings[i] = dict(bookings[i],
+                           date=date_str,
+                           time=time_str,
+                           direction=direction)
+        new = Booking.from_dict(bookings[i])
+    trip_index.applied(base, added=[(uid, new)], removed=[(uid, old)])
+    phone_index.applied(base, added=[(uid, new)], removed=[(uid, old)])
+    return new
+
+
+# ---- Лист очікування ----
+def promote_waitlist(key: str):
+    """Переводить пасажирів із черги в бронювання, поки вистачає місць.
+    На заблокований або вже відправлений рейс — нікого."""
+    if is_route_locked(key) or departed(key):
+        return []
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    added = []
+    with day_tx(key[:10]) as day, waitlist.edit() as wl:
+        base = trip_index.fresh().version
+        free = TRIP_CAPACITY - trip_index.booked(key)
+        promoted = waitlist.pop_fitting(wl, key, free)
+        for entry in promoted:
+            booking = dict(entry["booking"], created_at=now)
+            day.setdefault(entry["uid"], []).append(booking)
+            added.append((entry["uid"], Booking.from_dict(booking)))
+    trip_index.applied(base, added=added)
+    phone_index.applied(base, added=added)
+    return promoted
+
+
+async def notify_promoted(bot_: Bot, promoted):
+    for entry in promoted:
+        b = entry["booking"]
+        try:
+            await bot_.send_message(
+                int(entry["uid"]),
+                "✅ Звільнилось місце — ваше бронювання з листа очікування "
+                f"підтверджено!\n📅 {b['date']} | 🕒 {b['time']} | "
+                f"{b['direction']} | {b['seats']} місць")
+        except Exception:
+            pass  # користувач заблокував бота — бронювання все одно створено
+
+
+def lock_button(key: str):
+    """Кнопка 🔒/🔓 для маніфесту; None — якщо рейс не має короткого ID."""
+    tid = trip_id(key)
+    if tid is None:
+        return None
+    text = "🔓 Розблокувати рейс" if is_route_locked(
+        key) else "🔒 Заблокувати рейс"
+    return InlineKeyboardButton(text=text, callback_data=f"lock:{tid}")
+
+
+def trip_recipients(key: str):
+    """Кому писати про зміни рейсу: пасажири з бронюванням і з черги."""
+    queued = [e["uid"] for e in waitlist.fresh().queues.get(key, ())]
+    return list(dict.fromkeys(trip_index.passengers(key) + queued))
+
+
+def broadcast_button(key: str):
+    """Кнопка розсилки для маніфесту; None — якщо писати нікому."""
+    tid = trip_id(key)
+    if tid is None or not trip_recipients(key):
+        return None
+    return InlineKeyboardButton(text="📣 Повідомити пасажирів",
+                                callback_data=f"bcast:{tid}")
+
+
+def live_button(key: str):
+    """Кнопка живого маніфесту; None — якщо рейс не має короткого ID."""
+    tid = trip_id(key)
+    if tid is None:
+        return None
+    return InlineKeyboardButton(text="📌 Живий маніфест",
+                                callback_data=f"live:{tid}")
+
+
+def export_button(key: str):
+    """Кнопка маніфесту CSV-файлом; None — якщо рейс не має короткого ID."""
+    tid = trip_id(key)
+    if tid is None:
+        return None
+    return InlineKeyboardButton(text="📄 Файлом (CSV)",
+                                callback_data=f"csv:{tid}")
+
+
+def trip_actions(key: str):
+    """Кнопки маніфесту рейсу, по одній у рядку."""
+    return [[btn] for btn in (lock_button(key), broadcast_button(key),
+                              live_button(key), export_button(key))
+            if btn is not None]
+
+
+async def send_trip_actions(msg: types.Message, key: str):
+    rows = trip_actions(key)
+    if rows:
+        await msg.answer(f"Бронювання на рейс {key}:",
+                         reply_markup=InlineKeyboardMarkup(
+                             inline_keyboard=rows))
+
+
+# ====================== STATES ======================
+class BookingStates(StatesGroup):
+    waiting_for_seats = State()
+    waiting_for_date = State()
+    waiting_for_direction = State()
+    waiting_for_time = State()
+    waiting_for_comment = State()
+    waiting_for_phone = State()
+    driver_wait_phone = State()
+
+
+class BroadcastStates(StatesGroup):
+    waiting_for_text = State()
+
+
+class PhoneSearchStates(StatesGroup):
+    waiting_for_phone = State()
+
+
+class AdminStates(StatesGroup):
+    waiting_for_direction = State()
+    waiting_for_date = State()
+    waiting_for_time = State()
+
+
+class DriverMgmtStates(StatesGroup):
+    waiting_for_action = State()
+    waiting_for_new_driver = State()
+    waiting_for_remove_driver = State()
+
+
+class RoutesStates(StatesGroup):
+    pick_date = State()
+    pick_direction = State()
+    pick_time = State()
+    pick_driver = State()
+
+
+class MyRoutesStates(StatesGroup):
+    manual_date = State()
+    manual_direction = State()
+    manual_time = State()
+
+
+class AdminAdminStates(StatesGroup):
+    menu = State()
+    add_admin_wait = State()
+    add_admin_info = State()
+    remove_admin_wait = State()
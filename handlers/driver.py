@@ -0,0 +1,354 @@
+"""Водій (і адміністратор): панель, маніфести рейсів, ручне бронювання,
+блокування рейсів, мої рейси. Доступ перевіряє RoleMiddleware роутера."""
+from datetime import datetime, timedelta
+from aiogram import types, F
+from aiogram.types import (ReplyKeyboardMarkup, KeyboardButton,
+                           InlineKeyboardMarkup, InlineKeyboardButton,
+                           CallbackQuery)
+from aiogram.fsm.context import FSMContext
+import manifests
+from broadcast import broadcast
+from menu import MenuRouter
+from phones import normalize_phone, phone_index
+from middlewares import RoleMiddleware
+from records import minute_str, parse_minute
+from trips import trip_from_id, trip_key
+from handlers.common import (CANCEL_TEXT, AdminStates, BookingStates,
+                             BroadcastStates, MyRoutesStates,
+                             PhoneSearchStates, base_times_for,
+                             driver_dates_minus3_plus7, is_admin, is_driver,
+                             is_route_locked, load_routes, lock_button,
+                             lock_route, main_menu, notify_promoted,
+                             promote_waitlist, rows_of, send_trip_actions,
+                             trip_actions, trip_bookings, trip_recipients,
+                             unlock_route)
+
+router = MenuRouter(name="driver")
+_only_drivers = RoleMiddleware(is_driver,
+                               "⛔ Доступ лише для водіїв/адміністраторів.")
+router.message.middleware(_only_drivers)
+router.callback_query.middleware(_only_drivers)
+router.menu.message.middleware(_only_drivers)
+
+
+# ====================== ADMIN / DRIVER PANEL ======================
+@router.button("👨‍✈️ Адмін-панель")
+async def admin_panel(msg: types.Message, state: FSMContext):
+    uid = msg.from_user.id
+    rows = [[KeyboardButton(text="🚌 Обрати поїздку")],
+            [KeyboardButton(text="🚐 Додати бронювання вручну")],
+            [KeyboardButton(text="🔎 Пошук за телефоном")],
+            [KeyboardButton(text="📋 Мої рейси")],
+            [KeyboardButton(text="🕒 Переглянути рейс вручну")]]
+    if is_admin(uid):
+        rows.insert(3, [KeyboardButton(text="📅 Керування рейсами")])
+        rows.insert(4, [KeyboardButton(text="👨‍✈️ Керування водіями")])
+        rows.insert(5, [KeyboardButton(text="🛠 Керування адміністраторами")])
+        rows.insert(6, [KeyboardButton(text="📊 Завантаженість")])
+    rows.append([KeyboardButton(text="🏠 Повернутись в головне меню")])
+
+    await msg.answer("👨‍✈️ Адмін-панель: оберіть дію",
+                     reply_markup=ReplyKeyboardMarkup(keyboard=rows,
+                                                      resize_keyboard=True))
+
+
+# ---- Перегляд рейсу (всі бронювання по рейсу) ----
+@router.button("🚌 Обрати поїздку")
+async def picker_direction(msg: types.Message, state: FSMContext):
+    kb = ReplyKeyboardMarkup(
+        keyboard=[[KeyboardButton(text="🚐 Київ → Рокитне")],
+                  [KeyboardButton(text="🚌 Рокитне → Київ")],
+                  [KeyboardButton(text="🏠 Повернутись в головне меню")]],
+        resize_keyboard=True)
+    await msg.answer("Оберіть напрямок:", reply_markup=kb)
+    await state.set_state(AdminStates.waiting_for_direction)
+
+
+@router.message(AdminStates.waiting_for_direction)
+async def picker_date(msg: types.Message, state: FSMContext):
+    direction = msg.text
+    await state.update_data(direction=direction)
+    dates = driver_dates_minus3_plus7()
+    kb = [[KeyboardButton(text=str(d))] for d in dates]
+    kb.append([KeyboardButton(text="🏠 Повернутись в головне меню")])
+    await msg.answer("Оберіть дату рейсу:",
+                     reply_markup=ReplyKeyboardMarkup(keyboard=kb,
+                                                      resize_keyboard=True))
+    await state.set_state(AdminStates.waiting_for_date)
+
+
+@router.message(AdminStates.waiting_for_date)
+async def picker_time(msg: types.Message, state: FSMContext):
+    try:
+        selected_date = datetime.strptime(msg.text, "%Y-%m-%d").date()
+    except:
+        await msg.answer("Оберіть дату із кнопок.")
+        return
+    ud = await state.get_data()
+    times = base_times_for(ud["direction"])
+    kb = rows_of([KeyboardButton(text=t) for t in times], 3)
+    kb.append([KeyboardButton(text="🏠 Повернутись в головне меню")])
+    await state.update_data(date=str(selected_date))
+    await msg.answer("Оберіть час:",
+                     reply_markup=ReplyKeyboardMarkup(keyboard=kb,
+                                                      resize_keyboard=True))
+    await state.set_state(AdminStates.waiting_for_time)
+
+
+@router.message(AdminStates.waiting_for_time)
+async def show_trip_bookings(msg: types.Message, state: FSMContext):
+    ud = await state.get_data()
+    direction, date_str, time_str = ud["direction"], ud["date"], msg.text
+
+    try:
+        bookings_list = trip_bookings(date_str, time_str, direction)
+    except ValueError:
+        await msg.answer("Оберіть час із кнопок.")
+        return
+
+    key = trip_key(date_str, minute_str(parse_minute(time_str)), direction)
+    if not bookings_list:
+        await msg.answer("🚫 Немає бронювань на цей рейс.",
+                         reply_markup=main_menu(msg.from_user.id))
+        await send_trip_actions(msg, key)
+        await state.clear()
+        return
+
+    rows = [[
+        InlineKeyboardButton(
+            text="📋 Повний список бронювань",
+            callback_data=f"list:{date_str}|{time_str}|{direction}")
+    ]]
+    rows += trip_actions(key)
+    await msg.answer(manifests.manifest_text(key),
+                     reply_markup=InlineKeyboardMarkup(inline_keyboard=rows))
+    await state.clear()
+
+
+@router.callback_query(F.data.startswith("list:"))
+async def show_detailed_list(call: CallbackQuery):
+    _, payload = call.data.split(":", 1)
+    date_str, time_str, direction = payload.split("|", 2)
+    bookings = trip_bookings(date_str, time_str, direction)
+    if not bookings:
+        await call.answer("Немає бронювань.")
+        return
+    key = trip_key(date_str, minute_str(parse_minute(time_str)), direction)
+    await call.message.answer(manifests.manifest_text(key))
+
+
+# ---- Ручне бронювання водієм ----
+@router.button("🚐 Додати бронювання вручну")
+async def driver_manual_booking(msg: types.Message, state: FSMContext):
+    await state.update_data(driver_mode=True)
+    kb = ReplyKeyboardMarkup(keyboard=[[
+        KeyboardButton(text="1"),
+        KeyboardButton(text="2"),
+        KeyboardButton(text="3")
+    ], [KeyboardButton(text=CANCEL_TEXT)]],
+                             resize_keyboard=True)
+    await msg.answer("Скільки місць для клієнта?", reply_markup=kb)
+    await state.set_state(BookingStates.waiting_for_seats)
+
+
+# ---- Пошук бронювань пасажира за телефоном ----
+@router.button("🔎 Пошук за телефоном")
+async def phone_search_start(msg: types.Message, state: FSMContext):
+    kb = ReplyKeyboardMarkup(
+        keyboard=[[KeyboardButton(text="🏠 Повернутись в головне меню")]],
+        resize_keyboard=True)
+    await msg.answer("Введіть номер телефону пасажира:", reply_markup=kb)
+    await state.set_state(PhoneSearchStates.waiting_for_phone)
+
+
+@router.message(PhoneSearchStates.waiting_for_phone)
+async def phone_search(msg: types.Message, state: FSMContext):
+    phone = normalize_phone(msg.text)
+    if phone is None:
+        await msg.answer("Невірний номер. Приклад: 0681234567")
+        return
+    now = datetime.now()
+    found = [(uid, b) for uid, b in phone_index.find(phone)
+             if b.departure > now]
+    owner = phone_index.owner(phone)
+    text = f"📞 {phone}" + (f" | 👤 ID {owner}" if owner else "") + "\n"
+    if not found:
+        text += "🚫 Майбутніх бронювань немає."
+    for _, b in found:
+        text += (f"📅 {b.date} | 🕒 {b.time} | {b.direction} | "
+                 f"{b.seats} місць | {b.comment}\n")
+    await msg.answer(text, reply_markup=main_menu(msg.from_user.id))
+    await state.clear()
+
+
+# ---- Блокування рейсів (водій або адмін): кнопка 🔒/🔓 на маніфесті ----
+@router.callback_query(F.data.startswith("lock:"))
+async def toggle_lock_cb(call: CallbackQuery):
+    key = trip_from_id(call.data.split(":", 1)[1])
+    locked = not is_route_locked(key)
+    if locked:
+        lock_route(key)
+    else:
+        unlock_route(key)
+    markup = call.message.reply_markup if call.message else None
+    if markup is not None:
+        rows = [[lock_button(key) if b.callback_data == call.data else b
+                 for b in row] for row in markup.inline_keyboard]
+        await call.message.edit_reply_markup(
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=rows))
+    await call.answer("🔒 Рейс заблоковано для бронювання."
+                      if locked else "🔓 Рейс розблоковано.")
+    if not locked:
+        await notify_promoted(call.bot, promote_waitlist(key))
+
+
+# ---- Живий маніфест: закріплене повідомлення, яке бот оновлює сам ----
+@router.callback_query(F.data.startswith("live:"))
+async def live_manifest_cb(call: CallbackQuery):
+    key = trip_from_id(call.data.split(":", 1)[1])
+    await manifests.pin(call.bot, call.from_user.id, key)
+    await call.answer("📌 Маніфест закріплено — він оновлюватиметься сам.")
+
+
+@router.callback_query(F.data.startswith("unlive:"))
+async def stop_live_manifest_cb(call: CallbackQuery):
+    key = trip_from_id(call.data.split(":", 1)[1])
+    if not await manifests.unpin(call.bot, call.from_user.id, key):
+        # маніфест уже знято (замінено новим) — прибираємо кнопки
+        await call.message.edit_reply_markup(reply_markup=None)
+    await call.answer("⏹ Оновлення маніфесту зупинено.")
+
+
+# ---- Маніфест файлом (повторно — file_id, доки рейс не змінився) ----
+@router.callback_query(F.data.startswith("csv:"))
+async def export_manifest_cb(call: CallbackQuery):
+    key = trip_from_id(call.data.split(":", 1)[1])
+    await manifests.send_export(call.bot, call.from_user.id, key)
+    await call.answer()
+
+
+# ---- Розсилка пасажирам рейсу (затримка, скасування) ----
+BROADCAST_TEMPLATES = ("⏰ Рейс затримується приблизно на 15 хв.",
+                       "⏰ Рейс затримується приблизно на 30 хв.",
+                       "❌ Рейс скасовано.")
+
+
+@router.callback_query(F.data.startswith("bcast:"))
+async def broadcast_start_cb(call: CallbackQuery, state: FSMContext):
+    key = trip_from_id(call.data.split(":", 1)[1])
+    n = len(trip_recipients(key))
+    await state.set_state(BroadcastStates.waiting_for_text)
+    await state.update_data(broadcast_key=key)
+    kb = [[KeyboardButton(text=t)] for t in BROADCAST_TEMPLATES]
+    kb.append([KeyboardButton(text=CANCEL_TEXT)])
+    await call.message.answer(
+        f"📣 Рейс {key}, отримувачів: {n}.\n"
+        "Оберіть шаблон або напишіть своє повідомлення:",
+        reply_markup=ReplyKeyboardMarkup(keyboard=kb, resize_keyboard=True))
+    await call.answer()
+
+
+@router.message(BroadcastStates.waiting_for_text, F.text)
+async def broadcast_send(msg: types.Message, state: FSMContext):
+    key = (await state.get_data())["broadcast_key"]
+    await state.clear()
+    date_str, time_str, direction = key.split(" ", 2)
+    text = (f"📣 Повідомлення щодо вашого рейсу\n"
+            f"📅 {date_str} | 🕒 {time_str} | {direction}\n\n{msg.text}")
+    result = await broadcast(msg.bot, trip_recipients(key), text)
+    report = (f"✅ Надіслано {len(result.sent)} з {result.total} "
+              f"за {result.elapsed:.1f} с.")
+    if result.failed:
+        reasons = {"blocked": "заблокували бота", "flood": "ліміт Telegram"}
+        report += "\n⚠️ Не доставлено:\n" + "\n".join(
+            f"ID {uid} — {reasons.get(why, why)}"
+            for uid, why in result.failed.items())
+    await msg.answer(report, reply_markup=main_menu(msg.from_user.id))
+
+
+# ---- Мої рейси (водій) ----
+@router.button("📋 Мої рейси")
+async def my_routes(msg: types.Message, state: FSMContext):
+    routes = load_routes()
+    my = []
+    today = datetime.now().date()
+    for _, r in routes.items():
+        if r.get("driver_id") == msg.from_user.id:
+            d = datetime.strptime(r["date"], "%Y-%m-%d").date()
+            if (today - timedelta(days=1)) <= d <= (today + timedelta(days=7)):
+                my.append(r)
+    if not my:
+        await msg.answer("Немає призначених рейсів у найближчі дні.")
+        return
+
+    my.sort(key=lambda x: (x["date"], x["time"]))
+    text = "📋 Ваші рейси:\n\n" + "\n".join(
+        [f"• {r['date']} | {r['time']} | {r['direction']}" for r in my])
+    await msg.answer(text)
+
+
+# ---- Переглянути рейс вручну (водій) ----
+@router.button("🕒 Переглянути рейс вручну")
+async def driver_manual_view_date(msg: types.Message, state: FSMContext):
+    dates = driver_dates_minus3_plus7()
+    kb = [[KeyboardButton(text=str(d))] for d in dates]
+    kb.append([KeyboardButton(text="🏠 Повернутись в головне меню")])
+    await msg.answer("Оберіть дату:",
+                     reply_markup=ReplyKeyboardMarkup(keyboard=kb,
+                                                      resize_keyboard=True))
+    await state.set_state(MyRoutesStates.manual_date)
+
+
+@router.message(MyRoutesStates.manual_date)
+async def driver_manual_view_direction(msg: types.Message, state: FSMContext):
+    try:
+        sel = datetime.strptime(msg.text, "%Y-%m-%d").date()
+    except:
+        await msg.answer("Оберіть дату із кнопок.")
+        return
+    await state.update_data(date=str(sel))
+    kb = ReplyKeyboardMarkup(
+        keyboard=[[KeyboardButton(text="🚐 Київ → Рокитне")],
+                  [KeyboardButton(text="🚌 Рокитне → Київ")],
+                  [KeyboardButton(text="🏠 Повернутись в головне меню")]],
+        resize_keyboard=True)
+    await msg.answer("Оберіть напрямок:", reply_markup=kb)
+    await state.set_state(MyRoutesStates.manual_direction)
+
+
+@router.message(MyRoutesStates.manual_direction)
+async def driver_manual_view_time(msg: types.Message, state: FSMContext):
+    direction = msg.text
+    await state.update_data(direction=direction)
+    times = base_times_for(direction)
+    kb = rows_of([KeyboardButton(text=t) for t in times], 3)
+    kb.append([KeyboardButton(text="🏠 Повернутись в головне меню")])
+    await msg.answer("Оберіть час:",
+                     reply_markup=ReplyKeyboardMarkup(keyboard=kb,
+                                                      resize_keyboard=True))
+    await state.set_state(MyRoutesStates.manual_time)
+
+
+@router.message(MyRoutesStates.manual_time)
+async def driver_manual_view_show(msg: types.Message, state: FSMContext):
+    ud = await state.get_data()
+    date_str, direction, time_str = ud["date"], ud["direction"], msg.text
+
+    try:
+        bookings = trip_bookings(date_str, time_str, direction)
+    except ValueError:
+        await msg.answer("Оберіть час із кнопок.")
+        return
+
+    key = trip_key(date_str, minute_str(parse_minute(time_str)), direction)
+    if not bookings:
+        await msg.answer("🚫 Немає бронювань на цей рейс.",
+                         reply_markup=main_menu(msg.from_user.id))
+        await send_trip_actions(msg, key)
+        await state.clear()
+        return
+
+    await msg.answer(manifests.manifest_text(key),
+                     reply_markup=main_menu(msg.from_user.id))
+    await send_trip_actions(msg, key)
+    await state.clear()
@@ -0,0 +1,231 @@
+"""Inline-пошук рейсів: "@бот Київ завтра 2" у будь-якому чаті.
+
+Результати беруться з availability (без читання сховища). Кнопка під
+надісланим результатом бронює одним натисканням — із телефоном і місцем
+посадки, які пасажир уже вказував. Хто ще не дав телефон, переходить у
+бота за deep link /start b<рейс>-<місця> і закінчує звичайне бронювання.
+"""
+import re
+from datetime import datetime, timedelta
+
+from aiogram import F, Router
+from aiogram.types import (CallbackQuery, InlineKeyboardButton,
+                           InlineKeyboardMarkup, InlineQuery,
+                           InlineQueryResultArticle, InlineQueryResultsButton,
+                           InputTextMessageContent)
+
+from availability import availability
+from config import INLINE_CACHE_TIME
+from phones import phone_index
+from records import Booking, Direction, day_str, minute_str
+from trips import has_room, trip_from_id, trip_id, trip_index, trip_key
+from partitions import load_user, user_tx
+from handlers.common import (base_times_for, default_pickup,
+                             filtered_times_for_user, user_dates_7days)
+
+router = Router(name="inline")
+
+MAX_RESULTS = 50  # ліміт Telegram на одну відповідь
+WEEKDAYS = ("пн", "вт", "ср", "чт", "пт", "сб", "нд")
+_WEEKDAY_STEMS = ("понеділ", "вівтор", "серед", "четвер", "п'ятниц",
+                  "субот", "неділ")
+_RELATIVE = {"сьогодні": 0, "today": 0, "завтра": 1, "tomorrow": 1,
+             "післязавтра": 2}
+_KYIV = ("київ", "києв", "kyiv", "kiev")
+_ROKYTNE = ("рокит", "rokyt")
+_FROM = ("з", "із", "зі", "від", "from")
+_TOKEN = re.compile(r"[\w'’.\-]+")
+
+
+def _place(word):
+    if word.startswith(_KYIV):
+        return "kyiv"
+    if word.startswith(_ROKYTNE):
+        return "rokytne"
+    return None
+
+
+def _day(word, today):
+    """Дата з одного слова або None: "завтра", "пт", "31.10", "2025-10-31"."""
+    if word in _RELATIVE:
+        return today + timedelta(days=_RELATIVE[word])
+    word = word.replace("’", "'")
+    for i, (short, stem) in enumerate(zip(WEEKDAYS, _WEEKDAY_STEMS)):
+        if word == short or word.startswith(stem) or \
+                word.startswith(stem.replace("'", "")):
+            return today + timedelta(days=(i - today.weekday()) % 7)
+    for fmt in ("%d.%m", "%d.%m.%Y", "%Y-%m-%d"):
+        try:
+            parsed = datetime.strptime(word, fmt).date()
+        except ValueError:
+            continue
+        if fmt == "%d.%m":
+            parsed = parsed.replace(year=today.year)
+            if parsed < today:
+                parsed = parsed.replace(year=today.year + 1)
+        return parsed
+    return None
+
+
+def parse_query(text, today):
+    """"з Києва завтра 2" -> (дні, напрямки, місця). Чого немає в
+    запиті — усі дні вікна, обидва напрямки, 1 місце. Одне місто без
+    "з" — це куди їхати."""
+    days, places, seats, origin = set(), [], 1, None
+    after_from = False
+    for word in _TOKEN.findall(text.lower()):
+        if word in _FROM:
+            after_from = True
+            continue
+        place = _place(word)
+        if place is not None:
+            if after_from:
+                origin = place
+            places.append(place)
+        elif word.isdigit() and 1 <= int(word) <= 9:
+            seats = int(word)
+        else:
+            day = _day(word, today)
+            if day is not None:
+                days.add(day)
+        after_from = False
+    window = {today + timedelta(days=i) for i in range(7)}
+    days = {d.toordinal() for d in (days & window if days else window)}
+    if origin is None and len(places) >= 2:
+        origin = places[0]
+    elif origin is None and places:
+        origin = "rokytne" if places[0] == "kyiv" else "kyiv"
+    if origin == "kyiv":
+        directions = [Direction.KYIV_ROKYTNE]
+    elif origin == "rokytne":
+        directions = [Direction.ROKYTNE_KYIV]
+    else:
+        directions = list(Direction)
+    return days, directions, seats
+
+
+def start_payload(tid: str, seats) -> str:
+    """Параметр deep link: у /start дозволені лише [A-Za-z0-9_-]."""
+    return f"b{tid.replace('.', '_')}-{seats}"
+
+
+def bookable(key: str) -> bool:
+    """Чи може пасажир зараз забронювати цей рейс: він є в розкладі, у
+    вікні 7 днів і відправляється не раніше ніж за MIN_LEAD."""
+    date_str, time_str, direction = key.split(" ", 2)
+    try:
+        day = datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        return False
+    return (day in user_dates_7days()
+            and time_str in filtered_times_for_user(direction, day))
+
+
+def parse_start_payload(args):
+    """(trip_key, місця) з параметра /start або None. Чи рейс ще можна
+    бронювати — окремо, bookable()."""
+    m = re.fullmatch(r"b(\d+)_(\d+)_(\d+)-([1-9])", args or "")
+    if m is None or int(m.group(2)) >= 24 * 60:
+        return None
+    try:
+        key = trip_from_id(".".join(m.groups()[:3]))
+    except (IndexError, ValueError):
+        return None
+    return key, int(m.group(4))
+
+
+def _result(day, minute, direction, left, seats):
+    key = trip_key(day_str(day), minute_str(minute), direction)
+    tid = trip_id(key)
+    when = datetime.fromordinal(day)
+    date_text = f"{WEEKDAYS[when.weekday()].capitalize()} " \
+        f"{when:%d.%m}"
+    kb = InlineKeyboardMarkup(inline_keyboard=[[
+        InlineKeyboardButton(text=f"✅ Забронювати {seats} місць",
+                             callback_data=f"ib:{tid}:{seats}")
+    ]])
+    return InlineQueryResultArticle(
+        id=f"{tid}:{seats}",
+        title=f"🕒 {minute_str(minute)} · {direction}",
+        description=f"{date_text} · вільно {left} місць",
+        input_message_content=InputTextMessageContent(
+            message_text=f"{direction}\n📅 {date_text} о {minute_str(minute)}"
+            f"\n💺 {seats} місць"),
+        reply_markup=kb)
+
+
+@router.inline_query()
+async def search_trips(query: InlineQuery):
+    now = datetime.now()
+    days, directions, seats = parse_query(query.query, now.date())
+    found = availability.search(days, directions, seats, base_times_for,
+                                now)[:MAX_RESULTS]
+    button = None
+    if not found:
+        button = InlineQueryResultsButton(text="Вільних рейсів немає — "
+                                          "відкрити бота",
+                                          start_parameter="inline")
+    await query.answer([_result(*f, seats) for f in found],
+                       cache_time=INLINE_CACHE_TIME,
+                       is_personal=False,
+                       button=button)
+
+
+def book_now(uid: str, key: str, seats: int) -> dict:
+    """Бронює рейс одним записом сховища з телефоном, який пасажир уже
+    дав. ValueError з поясненням — якщо не вийшло (нічого не записано)."""
+    date_str, time_str, direction = key.split(" ", 2)
+    if not bookable(key):
+        raise ValueError("🚫 Бронювання на цей рейс уже закрито.")
+    with user_tx(uid) as user:
+        base = trip_index.fresh().version
+        if not user.get("phone"):
+            raise ValueError("Спершу вкажіть телефон у боті.")
+        if any(
+                trip_key(b.get("date"), b.get("time"), b.get("direction")) ==
+                key for b in user["bookings"]):
+            raise ValueError("У вас уже є бронювання на цей рейс.")
+        if not has_room(key, seats):
+            raise ValueError("🚫 Вільних місць уже немає.")
+        # посадка — як в останньому власному бронюванні в цьому напрямку
+        comment = next((b.get("comment") for b in reversed(user["bookings"])
+                        if b.get("direction") == direction
+                        and not b.get("created_by_driver")),
+                       default_pickup(direction))
+        booking = {
+            "date": date_str,
+            "time": time_str,
+            "direction": direction,
+            "seats": str(seats),
+            "comment": comment,
+            "phone": user["phone"],
+            "created_by_driver": False,
+            "driver_id": None,
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        user["bookings"].append(booking)
+    added = [(uid, Booking.from_dict(booking))]
+    trip_index.applied(base, added=added)
+    phone_index.applied(base, added=added)
+    return booking
+
+
+@router.callback_query(F.data.startswith("ib:"))
+async def inline_book_cb(call: CallbackQuery):
+    _, tid, seats = call.data.split(":")
+    uid = str(call.from_user.id)
+    if not (load_user(uid) or {}).get("phone"):
+        # телефону ще немає — бронювання закінчується в чаті з ботом
+        me = await call.bot.me()
+        await call.answer(url=f"https://t.me/{me.username}?start="
+                          f"{start_payload(tid, seats)}")
+        return
+    try:
+        b = book_now(uid, trip_from_id(tid), int(seats))
+    except ValueError as e:
+        await call.answer(str(e), show_alert=True)
+        return
+    await call.answer(
+        f"✅ Заброньовано: {b['date']} о {b['time']}, {b['seats']} місць.\n"
+        f"📍 {b['comment']}\nЗмінити чи скасувати — у «📋 Мої бронювання».",
+        show_alert=True)
@@ -0,0 +1,572 @@
+"""Пасажир: старт, бронювання (також ручне бронювання водієм), мої
+бронювання, скасування та лист очікування."""
+from datetime import datetime
+from aiogram import types, F
+from aiogram.filters import CommandObject, CommandStart
+from aiogram.types import (ReplyKeyboardMarkup, KeyboardButton,
+                           InlineKeyboardMarkup, InlineKeyboardButton,
+                           CallbackQuery)
+from aiogram.fsm.context import FSMContext
+import recurring
+from config import TRIP_CAPACITY
+from handlers.inline import bookable, parse_start_payload
+from menu import MenuRouter
+from partitions import expire_user, load_user, user_tx
+from phones import normalize_phone, phone_index
+from records import Booking, Passenger, minute_str, parse_day, parse_minute
+from trips import trip_from_id, trip_id, trip_index, trip_key, waitlist
+from handlers.common import (CANCEL_TEXT, BookingStates, base_times_for,
+                             default_pickup, driver_dates_minus3_plus7,
+                             filtered_times_for_user, has_room,
+                             is_route_locked, main_menu, move_booking,
+                             notify_promoted,
+                             promote_waitlist, rows_of, user_dates_7days)
+
+router = MenuRouter(name="passenger")
+
+
+# ====================== START / CANCEL / HOME ======================
+@router.message(CommandStart())
+async def start(msg: types.Message, state: FSMContext,
+                command: CommandObject):
+    await state.clear()
+    uid = str(msg.from_user.id)
+    if load_user(uid) is None:
+        with user_tx(uid):
+            base = trip_index.fresh().version  # порожній запис пасажира
+        trip_index.applied(base)
+        phone_index.applied(base)
+    await msg.answer(
+        "👋 Вітаємо у сервісі бронювання маршрутів Київ ↔️ Рокитне!",
+        reply_markup=main_menu(msg.from_user.id))
+    # перехід з inline-пошуку: рейс і місця вже обрано
+    picked = parse_start_payload(command.args)
+    if picked is not None and not bookable(picked[0]):
+        await msg.answer("🚫 Бронювання на цей рейс уже закрито. Оберіть "
+                         "інший у «🚐 Забронювати місце».")
+    elif picked is not None:
+        key, seats = picked
+        date_str, time_str, direction = key.split(" ", 2)
+        await state.update_data(driver_mode=False,
+                                seats=str(seats),
+                                date=date_str,
+                                time=time_str,
+                                direction=direction)
+        await msg.answer(f"{direction}\n📅 {date_str} о {time_str}, "
+                         f"{seats} місць.")
+        await ask_comment(msg, state)
+
+
+@router.button(CANCEL_TEXT)
+async def cancel_any(msg: types.Message, state: FSMContext):
+    await state.clear()
+    await msg.answer("Дію скасовано.",
+                     reply_markup=main_menu(msg.from_user.id))
+
+
+@router.button("🏠 Повернутись в головне меню")
+async def back_to_main(msg: types.Message, state: FSMContext):
+    await state.clear()
+    await msg.answer("🏠 Головне меню:",
+                     reply_markup=main_menu(msg.from_user.id))
+
+
+# ====================== BOOKING (USER + DRIVER) ======================
+@router.button("🚐 Забронювати місце")
+async def book_start(msg: types.Message, state: FSMContext):
+    await state.update_data(driver_mode=False)
+    kb = ReplyKeyboardMarkup(keyboard=[[
+        KeyboardButton(text="1"),
+        KeyboardButton(text="2"),
+        KeyboardButton(text="3")
+    ], [KeyboardButton(text=CANCEL_TEXT)]],
+                             resize_keyboard=True)
+    await msg.answer("Скільки місць хочете забронювати?", reply_markup=kb)
+    await state.set_state(BookingStates.waiting_for_seats)
+
+
+@router.message(BookingStates.waiting_for_seats)
+async def process_seats(msg: types.Message, state: FSMContext):
+    seats = msg.text.strip()
+    # більше, ніж у бусі, — не вмістилось би навіть з листа очікування
+    if not seats.isdigit() or not 0 < int(seats) <= TRIP_CAPACITY:
+        await msg.answer(f"Введіть число місць (1–{TRIP_CAPACITY}).")
+        return
+    await state.update_data(seats=seats)
+
+    is_driver_mode = (await state.get_data()).get("driver_mode", False)
+    dates = driver_dates_minus3_plus7(
+    ) if is_driver_mode else user_dates_7days()
+    kb = [[KeyboardButton(text=str(d))] for d in dates]
+    kb.append([KeyboardButton(text=CANCEL_TEXT)])
+    await msg.answer("Оберіть дату поїздки:",
+                     reply_markup=ReplyKeyboardMarkup(keyboard=kb,
+                                                      resize_keyboard=True))
+    await state.set_state(BookingStates.waiting_for_date)
+
+
+@router.message(BookingStates.waiting_for_date)
+async def process_date(msg: types.Message, state: FSMContext):
+    try:
+        selected_date = datetime.strptime(msg.text, "%Y-%m-%d").date()
+    except:
+        await msg.answer("Будь ласка, оберіть дату із кнопок.")
+        return
+
+    await state.update_data(date=str(selected_date))
+    kb = ReplyKeyboardMarkup(
+        keyboard=[[KeyboardButton(text="🚐 Київ → Рокитне")],
+                  [KeyboardButton(text="🚌 Рокитне → Київ")],
+                  [KeyboardButton(text=CANCEL_TEXT)]],
+        resize_keyboard=True)
+    await msg.answer("Оберіть напрямок:", reply_markup=kb)
+    await state.set_state(BookingStates.waiting_for_direction)
+
+
+@router.message(BookingStates.waiting_for_direction)
+async def process_direction(msg: types.Message, state: FSMContext):
+    direction = msg.text
+    ud = await state.get_data()
+    selected_date = datetime.strptime(ud["date"], "%Y-%m-%d").date()
+
+    times = base_times_for(direction) if ud.get(
+        "driver_mode") else filtered_times_for_user(direction, selected_date)
+    if not times:
+        await msg.answer("На обрану дату немає доступних рейсів.",
+                         reply_markup=main_menu(msg.from_user.id))
+        await state.clear()
+        return
+
+    buttons = []
+    for t in times:
+        key = trip_key(str(selected_date), t, direction)
+        # водій бронює на будь-який незаблокований рейс
+        is_open = (not is_route_locked(key) if ud.get("driver_mode") else
+                   has_room(key, int(ud["seats"])))
+        buttons.append(KeyboardButton(text=f"{'✅' if is_open else '❌'} {t}"))
+    kb_rows = rows_of(buttons, 3)
+
+    kb_rows.append([KeyboardButton(text=CANCEL_TEXT)])
+    await state.update_data(direction=direction)
+    await msg.answer("Оберіть час:",
+                     reply_markup=ReplyKeyboardMarkup(keyboard=kb_rows,
+                                                      resize_keyboard=True))
+    await state.set_state(BookingStates.waiting_for_time)
+
+
+@router.message(BookingStates.waiting_for_time)
+async def process_time(msg: types.Message, state: FSMContext):
+    ud = await state.get_data()
+    # кнопки мають вигляд "✅ 15:00" — зберігаємо лише сам час
+    try:
+        time_str = minute_str(parse_minute(msg.text))
+    except ValueError:
+        await msg.answer("Оберіть час із кнопок.")
+        return
+    # 🔥 перевірка, чи рейс заблокований або заповнений
+    key = trip_key(ud["date"], time_str, ud["direction"])
+    if ud.get("driver_mode"):
+        # водій бронює поза чергою — зупиняє лише блокування
+        if is_route_locked(key):
+            await msg.answer(
+                "🚫 Нажаль, на цей рейс місць немає. Уточніть у водія.",
+                reply_markup=main_menu(msg.from_user.id))
+            await state.clear()
+            return
+    elif not has_room(key, int(ud["seats"])):
+        await msg.answer(
+            "🚫 Зараз на цей рейс місць немає. Завершіть бронювання — і ми "
+            "поставимо вас у лист очікування та повідомимо, щойно "
+            "звільниться місце.")
+    await state.update_data(time=time_str)
+    await ask_comment(msg, state)
+
+
+async def ask_comment(msg: types.Message, state: FSMContext):
+    direction = (await state.get_data())["direction"]
+    kb = ReplyKeyboardMarkup(
+        keyboard=[[KeyboardButton(text=default_pickup(direction))],
+                  [KeyboardButton(text=CANCEL_TEXT)]],
+        resize_keyboard=True)
+    await msg.answer("Оберіть місце посадки або напишіть власний коментар:",
+                     reply_markup=kb)
+    await state.set_state(BookingStates.waiting_for_comment)
+
+
+@router.message(BookingStates.waiting_for_comment)
+async def process_comment(msg: types.Message, state: FSMContext):
+    await state.update_data(comment=msg.text)
+    ud = await state.get_data()
+
+    if ud.get("driver_mode"):
+        await msg.answer(
+            "Введіть номер телефону пасажира (+380XXXXXXXXX) або інший опис.")
+        await state.set_state(BookingStates.driver_wait_phone)
+        return
+
+    uid = str(msg.from_user.id)
+    phone = (load_user(uid) or {}).get("phone")
+    if not phone:
+        kb = ReplyKeyboardMarkup(keyboard=[[
+            KeyboardButton(text="📱 Надіслати свій номер", request_contact=True)
+        ], [KeyboardButton(text=CANCEL_TEXT)]],
+                                 resize_keyboard=True)
+        await msg.answer("Надішліть свій номер телефону:", reply_markup=kb)
+        await state.set_state(BookingStates.waiting_for_phone)
+    else:
+        await finalize_booking(msg, state, phone, created_by_driver=False)
+
+
+@router.message(BookingStates.waiting_for_phone, F.contact)
+async def process_contact(msg: types.Message, state: FSMContext):
+    uid = str(msg.from_user.id)
+    phone = normalize_phone(
+        msg.contact.phone_number) or msg.contact.phone_number
+    with user_tx(uid) as user:
+        base = trip_index.fresh().version
+        old, user["phone"] = user["phone"], phone
+    trip_index.applied(base)
+    phone_index.applied(base, phones=[(uid, old, phone)])
+    await finalize_booking(msg, state, phone, created_by_driver=False)
+
+
+@router.message(BookingStates.driver_wait_phone)
+async def process_driver_phone(msg: types.Message, state: FSMContext):
+    phone = msg.text.strip()
+    await finalize_booking(msg, state, phone, created_by_driver=True)
+
+
+async def finalize_booking(msg: types.Message, state: FSMContext, phone: str,
+                           created_by_driver: bool):
+    uid = str(msg.from_user.id)
+    ud = await state.get_data()
+    if not 0 < int(ud["seats"]) <= TRIP_CAPACITY:
+        await state.clear()
+        await msg.answer(f"🚫 Не більше {TRIP_CAPACITY} місць.",
+                         reply_markup=main_menu(msg.from_user.id))
+        return
+
+    comment = ud["comment"]
+    attached = False
+    if created_by_driver:
+        comment = f"{comment} (створено водієм)"
+        phone = normalize_phone(phone) or phone
+        # пасажир із цим номером уже є — бронювання йде в його запис,
+        # а не в запис водія
+        owner = phone_index.owner(phone)
+        attached = owner is not None and owner != uid
+        uid = owner or uid
+
+    booking = {
+        "date": ud["date"],
+        "time": ud["time"],
+        "direction": ud["direction"],
+        "seats": ud["seats"],
+        "comment": comment,
+        "phone": phone,
+        "created_by_driver": created_by_driver,
+        "driver_id": msg.from_user.id if created_by_driver else None,
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+    key = trip_key(booking["date"], booking["time"], booking["direction"])
+    # розбираємо до запису: невалідне бронювання не потрапить у сховище
+    parsed = Booking.from_dict(booking)
+    with user_tx(uid) as user:
+        base = trip_index.fresh().version
+        # водій бронює поза чергою на будь-який незаблокований рейс
+        # (див. process_time); пасажир — лише якщо є місця
+        queued = not created_by_driver and not has_room(
+            key, int(booking["seats"]))
+        phones = []
+        if not created_by_driver and not user["phone"]:
+            user["phone"] = phone
+            phones.append((uid, None, phone))
+        if not queued:
+            user["bookings"].append(booking)
+    added = [] if queued else [(uid, parsed)]
+    trip_index.applied(base, added=added)
+    phone_index.applied(base, added=added, phones=phones)
+
+    await state.clear()
+    if queued:
+        pos = waitlist.push(key, uid, booking)
+        await msg.answer(
+            f"📝 Місць немає — ви у листі очікування (№{pos}). "
+            "Ми повідомимо, щойно місце звільниться.",
+            reply_markup=main_menu(msg.from_user.id))
+        return
+    text = "✅ Бронювання підтверджено!"
+    if attached:
+        text += "\n👤 Додано до бронювань пасажира з цим номером."
+    await msg.answer(text, reply_markup=main_menu(msg.from_user.id))
+
+
+# ====================== МОЇ БРОНЮВАННЯ ======================
+def clean_and_get_upcoming(user_id: str):
+    user = Passenger.from_dict(load_user(user_id) or {"bookings": []})
+    now = datetime.now()
+    upcoming = [b for b in user.bookings if b.departure > now]
+    if len(upcoming) < len(user.bookings):
+        expire_user(user_id, now, _is_upcoming)
+    return upcoming
+
+
+def _is_upcoming(b: dict, now) -> bool:
+    try:
+        return Booking.from_dict(b).departure > now
+    except (KeyError, TypeError, ValueError):
+        return False
+
+
+@router.button("📋 Мої бронювання")
+async def my_bookings(msg: types.Message, state: FSMContext):
+    uid = str(msg.from_user.id)
+    upcoming = clean_and_get_upcoming(uid)
+    waiting = waitlist.entries_for(uid)
+    if not upcoming and not waiting:
+        await msg.answer("У вас немає активних бронювань.")
+        return
+    for b in upcoming:
+        text = (
+            f"📅 {b.date} | 🕒 {b.time} | {b.direction} | {b.seats} місць\n"
+            f"📍 {b.comment}\n"
+            f"🕒 Створено: {b.created_at or '?'}")
+        cb = f"cancel:{b.date}|{b.time}|{b.direction}"
+        buttons = [InlineKeyboardButton(text="❌ Скасувати", callback_data=cb)]
+        tid = trip_id(trip_key(b.date, b.time, b.direction))
+        rows = [buttons]
+        if tid is not None:
+            buttons.append(
+                InlineKeyboardButton(text="🔁 Перенести",
+                                     callback_data=f"mv:{tid}"))
+            rows.append([
+                InlineKeyboardButton(text="📆 Їздити так регулярно",
+                                     callback_data=f"sub:{tid}")
+            ])
+        kb = InlineKeyboardMarkup(inline_keyboard=rows)
+        await msg.answer(text, reply_markup=kb)
+    for key, entry in waiting:
+        b = entry["booking"]
+        text = (
+            f"⏳ Лист очікування (№{waitlist.position(key, uid)})\n"
+            f"📅 {b['date']} | 🕒 {b['time']} | {b['direction']} | {b['seats']} місць")
+        cb = f"wlleave:{b['date']}|{b['time']}|{b['direction']}"
+        kb = InlineKeyboardMarkup(inline_keyboard=[[
+            InlineKeyboardButton(text="🚪 Вийти з черги", callback_data=cb)
+        ]])
+        await msg.answer(text, reply_markup=kb)
+
+
+def _same_trip(b: dict, date_str, time_str, direction) -> bool:
+    try:
+        return Booking.from_dict(b).trip == (parse_day(date_str),
+                                             parse_minute(time_str), direction)
+    except (KeyError, TypeError, ValueError):
+        return False
+
+
+@router.callback_query(F.data.startswith("cancel:"))
+async def cancel_booking_cb(call: CallbackQuery):
+    _, payload = call.data.split(":", 1)
+    date_str, time_str, direction = payload.split("|", 2)
+    uid = str(call.from_user.id)
+    with user_tx(uid) as user:
+        base = trip_index.fresh().version
+        removed = [
+            b for b in user["bookings"]
+            if _same_trip(b, date_str, time_str, direction)
+        ]
+        user["bookings"] = [b for b in user["bookings"] if b not in removed]
+    # _same_trip уже розібрав ці записи — Booking.from_dict не впаде
+    parsed = [(uid, Booking.from_dict(b)) for b in removed]
+    trip_index.applied(base, removed=parsed)
+    phone_index.applied(base, removed=parsed)
+    if removed:
+        await call.message.edit_text("✅ Бронювання скасовано.")
+        promoted = promote_waitlist(trip_key(date_str, time_str, direction))
+        await notify_promoted(call.bot, promoted)
+    else:
+        await call.answer("Бронювання не знайдено.", show_alert=True)
+
+
+@router.callback_query(F.data.startswith("wlleave:"))
+async def leave_waitlist_cb(call: CallbackQuery):
+    _, payload = call.data.split(":", 1)
+    date_str, time_str, direction = payload.split("|", 2)
+    key = trip_key(date_str, time_str, direction)
+    if waitlist.remove(key, str(call.from_user.id)):
+        await call.message.edit_text("🚪 Ви вийшли з листа очікування.")
+        # якщо з черги вийшла її голова, наступні записи можуть вміститися
+        await notify_promoted(call.bot, promote_waitlist(key))
+    else:
+        await call.answer("Запис у черзі не знайдено.", show_alert=True)
+
+
+# ====================== ПЕРЕНЕСЕННЯ БРОНЮВАННЯ ======================
+# mv:<рейс> — вибір дати, mvd:<рейс>:<день> — вибір часу,
+# mvt:<рейс>:<новий рейс> — перенесення. Рейси — короткі ID з trips.trip_id.
+def _move_dates_kb(tid: str) -> InlineKeyboardMarkup:
+    buttons = [
+        InlineKeyboardButton(text=d.strftime("%d.%m"),
+                             callback_data=f"mvd:{tid}:{d.toordinal()}")
+        for d in user_dates_7days()
+    ]
+    return InlineKeyboardMarkup(inline_keyboard=rows_of(buttons, 4))
+
+
+def _move_times_kb(tid: str, day: int, uid: str):
+    src = trip_from_id(tid)
+    direction = src.split(" ", 2)[2]
+    seats = next((b.seats for u, b in trip_index.fresh().trips.get(src, [])
+                  if u == uid), 1)
+    sel = datetime.fromordinal(day).date()
+    buttons = []
+    for t in filtered_times_for_user(direction, sel):
+        dst = trip_key(str(sel), t, direction)
+        if dst != src and has_room(dst, seats):
+            cb = f"mvt:{tid}:{trip_id(dst)}"
+            buttons.append(InlineKeyboardButton(text=t, callback_data=cb))
+    rows = rows_of(buttons, 4)
+    rows.append([InlineKeyboardButton(text="⬅️ Інша дата",
+                                      callback_data=f"mv:{tid}")])
+    return InlineKeyboardMarkup(inline_keyboard=rows), bool(buttons)
+
+
+@router.callback_query(F.data.startswith("mv:"))
+async def move_pick_date_cb(call: CallbackQuery):
+    tid = call.data.split(":", 1)[1]
+    await call.message.edit_text(
+        f"🔁 Перенесення: {trip_from_id(tid)}\nОберіть нову дату:",
+        reply_markup=_move_dates_kb(tid))
+    await call.answer()
+
+
+@router.callback_query(F.data.startswith("mvd:"))
+async def move_pick_time_cb(call: CallbackQuery):
+    _, tid, day = call.data.split(":")
+    kb, any_free = _move_times_kb(tid, int(day), str(call.from_user.id))
+    text = (f"🔁 Перенесення: {trip_from_id(tid)}\n"
+            f"📅 {datetime.fromordinal(int(day)).date()}: ")
+    text += "оберіть час:" if any_free else "вільних рейсів немає."
+    await call.message.edit_text(text, reply_markup=kb)
+    await call.answer()
+
+
+@router.callback_query(F.data.startswith("mvt:"))
+async def move_booking_cb(call: CallbackQuery):
+    _, src_tid, dst_tid = call.data.split(":")
+    src, dst = trip_from_id(src_tid), trip_from_id(dst_tid)
+    try:
+        b = move_booking(str(call.from_user.id), src, dst)
+    except ValueError as e:
+        await call.answer(str(e), show_alert=True)
+        return
+    await call.message.edit_text(
+        "✅ Бронювання перенесено.\n"
+        f"📅 {b.date} | 🕒 {b.time} | {b.direction} | {b.seats} місць")
+    await call.answer()
+    # на старому рейсі звільнилися місця
+    await notify_promoted(call.bot, promote_waitlist(src))
+
+
+# ====================== РЕГУЛЯРНІ ПОЇЗДКИ ======================
+# sub:<рейс> — вибір днів, subw:<рейс>:<маска> — перемикання днів,
+# subs:<рейс>:<маска> — збереження; маска — біт на день тижня (Пн = 1).
+WEEKDAYS = ("Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Нд")
+WORKDAYS = 0b0011111
+
+
+def _weekdays_text(days) -> str:
+    return ", ".join(WEEKDAYS[d] for d in days)
+
+
+def _weekdays_kb(tid: str, mask: int) -> InlineKeyboardMarkup:
+    toggles = [
+        InlineKeyboardButton(
+            text=f"{'✅' if mask >> d & 1 else '▫️'} {WEEKDAYS[d]}",
+            callback_data=f"subw:{tid}:{mask ^ (1 << d)}") for d in range(7)
+    ]
+    rows = rows_of(toggles, 4)
+    rows.append([
+        InlineKeyboardButton(text="Пн–Пт",
+                             callback_data=f"subw:{tid}:{WORKDAYS}"),
+        InlineKeyboardButton(text="💾 Зберегти",
+                             callback_data=f"subs:{tid}:{mask}")
+    ])
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+@router.callback_query(F.data.startswith("sub:"))
+async def subscribe_start_cb(call: CallbackQuery):
+    tid = call.data.split(":", 1)[1]
+    day = int(tid.split(".", 1)[0])
+    mask = 1 << datetime.fromordinal(day).weekday()
+    await call.message.edit_text(
+        f"📆 {trip_from_id(tid)}\nУ які дні тижня бронювати цей рейс "
+        "автоматично?",
+        reply_markup=_weekdays_kb(tid, mask))
+    await call.answer()
+
+
+@router.callback_query(F.data.startswith("subw:"))
+async def subscribe_toggle_cb(call: CallbackQuery):
+    _, tid, mask = call.data.split(":")
+    await call.message.edit_reply_markup(
+        reply_markup=_weekdays_kb(tid, int(mask)))
+    await call.answer()
+
+
+@router.callback_query(F.data.startswith("subs:"))
+async def subscribe_save_cb(call: CallbackQuery):
+    _, tid, mask = call.data.split(":")
+    days = [d for d in range(7) if int(mask) >> d & 1]
+    if not days:
+        await call.answer("Оберіть хоча б один день.", show_alert=True)
+        return
+    uid = str(call.from_user.id)
+    key = trip_from_id(tid)
+    booking = next((b for b in (load_user(uid) or {}).get("bookings", [])
+                    if _same_trip(b, *key.split(" ", 2))), None)
+    if booking is None:
+        await call.answer("Бронювання не знайдено.", show_alert=True)
+        return
+    date_str, time_str, _ = key.split(" ", 2)  # у нормалізованому вигляді
+    booking = dict(booking, date=date_str, time=time_str)
+    recurring.add(uid, days, booking)
+    stats = recurring.materialize()
+    await call.message.edit_text(
+        f"✅ Регулярна поїздка: {_weekdays_text(days)} о {booking['time']}, "
+        f"{booking['direction']}.\n"
+        f"Бронювання на найближчі {recurring.DAYS} днів створюються "
+        f"автоматично (зараз: {stats['booked']}, у черзі: {stats['queued']}).")
+    await call.answer()
+
+
+@router.button("🔁 Регулярні поїздки")
+async def my_subscriptions(msg: types.Message, state: FSMContext):
+    subs = recurring.subscriptions(str(msg.from_user.id))
+    if not subs:
+        await msg.answer(
+            "Регулярних поїздок немає. Щоб додати, відкрийте «📋 Мої "
+            "бронювання» і натисніть «📆 Їздити так регулярно».")
+        return
+    for sub in subs:
+        kb = InlineKeyboardMarkup(inline_keyboard=[[
+            InlineKeyboardButton(text="🗑 Видалити",
+                                 callback_data=f"subdel:{sub['id']}")
+        ]])
+        await msg.answer(
+            f"📆 {_weekdays_text(sub['weekdays'])} | 🕒 {sub['time']} | "
+            f"{sub['direction']} | {sub['seats']} місць\n📍 {sub['comment']}",
+            reply_markup=kb)
+
+
+@router.callback_query(F.data.startswith("subdel:"))
+async def subscription_delete_cb(call: CallbackQuery):
+    if recurring.remove(str(call.from_user.id), int(call.data.split(":")[1])):
+        await call.message.edit_text(
+            "🗑 Регулярну поїздку видалено. Вже створені бронювання "
+            "лишаються в «📋 Мої бронювання».")
+    else:
+        await call.answer("Не знайдено.", show_alert=True)
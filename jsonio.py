@@ -0,0 +1,90 @@
+"""Серіалізація JSON-сховищ: orjson (якщо встановлено) або stdlib json.
+
+Використання як утиліти міграції:
+    python jsonio.py compact bookings.json routes.json
+    python jsonio.py pretty bookings.json
+"""
+import json
+import os
+import sys
+
+try:
+    import orjson
+except ImportError:  # orjson — необов'язкова залежність
+    orjson = None
+
+from config import JSON_BACKEND
+
+BACKENDS = ("auto", "orjson", "json")
+
+
+def _resolve_backend(name: str) -> str:
+    if name not in BACKENDS:
+        raise ValueError(f"Невідомий JSON-бекенд: {name!r}")
+    if name == "auto":
+        return "orjson" if orjson is not None else "json"
+    if name == "orjson" and orjson is None:
+        raise RuntimeError("JSON_BACKEND='orjson', але orjson не встановлено")
+    return name
+
+
+backend = _resolve_backend(JSON_BACKEND)
+
+
+def loads(raw, backend_name=None):
+    if (backend_name or backend) == "orjson":
+        return orjson.loads(raw)
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode("utf-8")
+    return json.loads(raw)
+
+
+def dumps(obj, compact=False, backend_name=None) -> bytes:
+    """Повертає UTF-8 байти; compact=True — без відступів і пробілів."""
+    if (backend_name or backend) == "orjson":
+        return orjson.dumps(obj, option=0 if compact else orjson.OPT_INDENT_2)
+    if compact:
+        text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    else:
+        text = json.dumps(obj, ensure_ascii=False, indent=2)
+    return text.encode("utf-8")
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def write_atomic(path, data: bytes):
+    """Пише у тимчасовий файл і підміняє ним path: збій посеред запису не
+    лишає наполовину записаний файл."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def dump(path, obj, compact=False):
+    write_atomic(path, dumps(obj, compact=compact))
+
+
+# ====================== MIGRATION CLI ======================
+def convert(path, compact):
+    obj = load(path)
+    dump(path, obj, compact=compact)
+    return obj
+
+
+def main(argv):
+    if len(argv) < 2 or argv[0] not in ("compact", "pretty"):
+        print("Використання: python jsonio.py compact|pretty FILE [FILE ...]")
+        return 2
+    compact = argv[0] == "compact"
+    for path in argv[1:]:
+        convert(path, compact)
+        print(f"{path}: {'compact' if compact else 'pretty'} ({backend})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,321 @@
+"""Маніфести рейсів: текст, CSV-файл і живі повідомлення водіїв.
+
+Текст і файл маніфесту тримаються в пам'яті, доки рейс не зміниться
+(лічильник змін у TripIndex, блокування, черга): повторний перегляд не
+перебирає бронювання, а повторний експорт надсилає file_id першого
+завантаження замість нового файлу.
+
+Живий маніфест: водій закріплює повідомлення зі списком пасажирів рейсу,
+і бот сам редагує його, коли бронювання рейсу змінюються.
+
+Документ "manifests": trip_key -> {uid водія: message_id} — одне
+повідомлення на водія й рейс. Зміни не надсилаються одразу: раз на
+MANIFEST_DEBOUNCE секунд фонова задача порівнює лічильник змін рейсу в
+TripIndex (stamps), блокування й чергу з тими, за якими маніфест показано
+востаннє. Серія бронювань за цей час дає одне edit_message_text, а рейси
+без змін не рендеряться. Коли рейс відправився, маніфест знімається.
+
+    text = manifests.manifest_text(key)
+    await manifests.send_export(bot, chat_id, key)
+    await manifests.pin(bot, uid, key)    # надіслати й закріпити
+    await manifests.unpin(bot, uid, key)  # зупинити оновлення
+"""
+import asyncio
+import csv
+import io
+import logging
+from datetime import datetime
+
+from aiogram.exceptions import (TelegramAPIError, TelegramBadRequest,
+                                TelegramForbiddenError, TelegramRetryAfter)
+from aiogram.types import (BufferedInputFile, InlineKeyboardButton,
+                           InlineKeyboardMarkup)
+
+from broadcast import RETRIES, pacer
+from config import MANIFEST_DEBOUNCE, TRIP_CAPACITY
+from store import DEFAULTS, get_store
+from trips import lock_index, trip_id, trip_index, waitlist
+
+log = logging.getLogger("manifests")
+
+_task = None
+_CACHE_SIZE = 512
+
+_texts = {}  # trip_key -> (стан рейсу, текст)
+_files = {}  # trip_key -> (стан рейсу, file_id)
+
+
+class Board:
+    """Закріплені маніфести (документ "manifests", перечитується, коли
+    змінилася версія) і що кожен із них зараз показує."""
+
+    def __init__(self):
+        self.version = None
+        self.pins = {}
+        self.shown = {}  # (trip_key, uid) -> (стан рейсу, текст)
+
+    def fresh(self):
+        store = get_store()
+        version = store.version("manifests")
+        if version != self.version:
+            self.prime(store.load("manifests", DEFAULTS["manifests"]),
+                       version)
+        return self
+
+    def prime(self, doc, version):
+        self.pins = doc
+        self.shown = {k: v for k, v in self.shown.items()
+                      if k[1] in doc.get(k[0], {})}
+        self.version = version
+
+    def update(self, changes) -> dict:
+        """changes: {(trip_key, uid): message_id або None — зняти}.
+        Повертає попередні message_id цих маніфестів."""
+        with get_store().transaction("manifests", {}) as doc:
+            base = self.fresh().version
+            old = {}
+            for (key, uid), message_id in changes.items():
+                owners = doc.setdefault(key, {})
+                old[(key, uid)] = owners.pop(uid, None)
+                if message_id is not None:
+                    owners[uid] = message_id
+                if not owners:
+                    del doc[key]
+                self.shown.pop((key, uid), None)
+            self.pins = doc
+        self.version = base + 1
+        return old
+
+
+board = Board()
+
+
+def _fresh():
+    trip_index.fresh()
+    lock_index.fresh()
+    waitlist.fresh()
+
+
+def _state(key):
+    """Усе, від чого залежить маніфест рейсу (без рендеру)."""
+    return (trip_index.stamps.get(key, 0), key in lock_index.locked,
+            waitlist.stamps.get(key, 0))
+
+
+def _cached(cache, key, state):
+    hit = cache.get(key)
+    return hit[1] if hit is not None and hit[0] == state else None
+
+
+def _remember(cache, key, state, value):
+    if len(cache) >= _CACHE_SIZE:
+        cache.clear()
+    cache[key] = (state, value)
+    return value
+
+
+def manifest_text(key: str) -> str:
+    """Список пасажирів рейсу з підсумком; збирається з індексу лише
+    тоді, коли рейс змінився з попереднього разу."""
+    _fresh()
+    state = _state(key)
+    text = _cached(_texts, key, state)
+    if text is not None:
+        return text
+    date_str, time_str, direction = key.split(" ", 2)
+    bookings = trip_index.bookings(key)
+    total = sum(b.seats for b in bookings)
+    text = f"📅 {date_str} | 🕒 {time_str} | {direction}\n—————————————\n"
+    for b in bookings:
+        mark = " (водій)" if b.created_by_driver else ""
+        text += (f"🕒 {b.created_at or '?'} | 📞 {b.phone} | "
+                 f"{b.seats} місць | {b.comment}{mark}\n")
+    if not bookings:
+        text += "🚫 Бронювань поки немає.\n"
+    text += (f"—————————————\nВсього заброньовано: {total} місць, "
+             f"вільно {max(TRIP_CAPACITY - total, 0)}")
+    queued = waitlist.size(key)
+    if queued:
+        text += f"\n⏳ У черзі: {queued}"
+    if lock_index.is_locked(key):
+        text += "\n🔒 Бронювання закрито"
+    return _remember(_texts, key, state, text)
+
+
+def manifest_csv(key: str) -> bytes:
+    """Маніфест для таблиці: бронювання, далі черга. UTF-8 з BOM, щоб
+    Excel правильно показав кирилицю."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(("статус", "створено", "ID", "телефон", "місць",
+                     "посадка", "водієм"))
+    for uid, b in trip_index.fresh().trips.get(key, ()):
+        writer.writerow(("бронювання", b.created_at or "", uid, b.phone,
+                         b.seats, b.comment,
+                         "так" if b.created_by_driver else ""))
+    for e in waitlist.fresh().queues.get(key, ()):
+        b = e["booking"]
+        writer.writerow(("черга", b.get("created_at", ""), e["uid"],
+                         b.get("phone", ""), b.get("seats", ""),
+                         b.get("comment", ""), ""))
+    return out.getvalue().encode("utf-8-sig")
+
+
+async def send_export(bot, chat_id, key: str):
+    """Надсилає маніфест CSV-файлом. Поки рейс не змінився, файл не
+    збирається й не завантажується вдруге — надсилається file_id."""
+    _fresh()
+    state = _state(key)
+    caption = f"📄 Маніфест: {key}"
+    file_id = _cached(_files, key, state)
+    if file_id is not None:
+        try:
+            return await bot.send_document(chat_id, file_id, caption=caption)
+        except TelegramBadRequest:
+            pass  # file_id більше не дійсний — завантажуємо знову
+    name = f"manifest-{trip_id(key) or 'trip'}.csv"
+    msg = await bot.send_document(
+        chat_id, BufferedInputFile(manifest_csv(key), filename=name),
+        caption=caption)
+    if msg.document is not None:
+        _remember(_files, key, state, msg.document.file_id)
+    return msg
+
+
+def render(key: str, live=True):
+    """Текст і кнопки живого маніфесту. live=False — останній вигляд, без
+    кнопок."""
+    from handlers.common import broadcast_button, export_button, lock_button
+
+    head = "🟢 Живий маніфест" if live else "⏹ Маніфест більше не оновлюється"
+    text = f"{head}\n{manifest_text(key)}"
+    if not live:
+        return text, None
+    rows = [[btn] for btn in (lock_button(key), broadcast_button(key),
+                              export_button(key)) if btn is not None]
+    rows.append([InlineKeyboardButton(text="⏹ Зупинити оновлення",
+                                      callback_data=f"unlive:{trip_id(key)}")])
+    return text, InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+async def _edit(bot, chat_id, message_id, text, markup):
+    """True — повідомлення показує text; False — його вже немає (видалено,
+    бота заблоковано); None — не вийшло зараз, спробувати наступного разу."""
+    for _ in range(RETRIES + 1):
+        await pacer.wait()
+        try:
+            await bot.edit_message_text(text, chat_id=chat_id,
+                                        message_id=message_id,
+                                        reply_markup=markup)
+        except TelegramRetryAfter as e:
+            pacer.pause(e.retry_after)
+            continue
+        except TelegramBadRequest as e:
+            return "not modified" in e.message
+        except TelegramForbiddenError:
+            return False
+        except TelegramAPIError:
+            return None
+        return True
+    return None
+
+
+async def _finish(bot, chat_id, message_id, key):
+    text, _ = render(key, live=False)
+    await _edit(bot, chat_id, message_id, text, None)
+    try:
+        await bot.unpin_chat_message(chat_id=chat_id, message_id=message_id)
+    except TelegramAPIError:
+        pass
+
+
+async def pin(bot, uid, key: str) -> int:
+    """Надсилає водію маніфест рейсу й закріплює його в чаті. Попередній
+    маніфест цього рейсу в нього перестає оновлюватися."""
+    _fresh()
+    state = _state(key)
+    text, markup = render(key)
+    msg = await bot.send_message(uid, text, reply_markup=markup)
+    try:
+        await bot.pin_chat_message(uid, msg.message_id,
+                                   disable_notification=True)
+    except TelegramAPIError:
+        pass  # не закріпилось — оновлюватись однаково буде
+    old = board.update({(key, str(uid)): msg.message_id})[(key, str(uid))]
+    board.shown[(key, str(uid))] = (state, text)
+    if old is not None:
+        await _finish(bot, uid, old, key)
+    return msg.message_id
+
+
+async def unpin(bot, uid, key: str) -> bool:
+    """Зупиняє оновлення маніфесту; False — якщо його не було."""
+    old = board.update({(key, str(uid)): None})[(key, str(uid))]
+    if old is None:
+        return False
+    await _finish(bot, uid, old, key)
+    return True
+
+
+async def refresh(bot, now=None) -> int:
+    """Один прохід: редагує маніфести рейсів, що змінилися з попереднього
+    показу, і знімає маніфести рейсів, які вже відправились. Повертає
+    кількість редагувань."""
+    pins = board.fresh().pins
+    if not pins:
+        return 0
+    now = now or datetime.now()
+    _fresh()
+    edits, gone, departed = 0, {}, []
+    for key, owners in list(pins.items()):
+        if datetime.strptime(key[:16], "%Y-%m-%d %H:%M") <= now:
+            departed.append(key)
+            continue
+        state, text = _state(key), None
+        for uid, message_id in owners.items():
+            shown = board.shown.get((key, uid))
+            if shown is not None and shown[0] == state:
+                continue
+            if text is None:
+                text, markup = render(key)
+            if shown is not None and shown[1] == text:
+                board.shown[(key, uid)] = (state, text)
+                continue
+            ok = await _edit(bot, int(uid), message_id, text, markup)
+            if ok:
+                board.shown[(key, uid)] = (state, text)
+                edits += 1
+            elif ok is False:
+                gone[(key, uid)] = None
+    for key in departed:
+        for uid, message_id in pins[key].items():
+            gone[(key, uid)] = None
+            await _finish(bot, int(uid), message_id, key)
+    if gone:
+        board.update(gone)
+    return edits
+
+
+# ====================== ФОНОВЕ ОНОВЛЕННЯ ======================
+async def _periodic(bot, interval):
+    while True:
+        try:
+            await refresh(bot)
+        except Exception:
+            log.exception("Не вдалося оновити живі маніфести")
+        await asyncio.sleep(interval)
+
+
+async def start(bot, interval=MANIFEST_DEBOUNCE):
+    """Оновлює маніфести кожні interval секунд: усі зміни рейсу за цей
+    час потрапляють в одне редагування."""
+    global _task
+    if interval > 0 and _task is None:
+        _task = asyncio.create_task(_periodic(bot, interval))
+
+
+async def stop():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        _task = None
@@ -0,0 +1,38 @@
+"""Кнопки меню як таблиця: точний текст кнопки -> обробник.
+
+aiogram перевіряє фільтри обробників по черзі, тож ланцюжок
+F.text == "..." коштує O(кількість кнопок) на кожне оновлення. MenuRouter
+реєструє один обробник із фільтром "текст є в dict" і далі викликає
+потрібну функцію за одним пошуком у словнику.
+
+Цей обробник живе в окремому роутері menu, який підключається перед
+усіма роутерами зі станами (див. handlers.routers): інакше, поки
+пасажир посеред бронювання, обробники його станів перехоплювали б кнопки
+водія й адміністратора. Кнопка меню завершує незакінчений діалог.
+Перевірки ролей роутера треба додати й до menu.
+"""
+from aiogram import F, Router
+
+
+class MenuRouter(Router):
+
+    def __init__(self, *, name=None):
+        super().__init__(name=name)
+        self.buttons = {}
+        self.menu = Router(name=f"{name}-menu" if name else None)
+        self.menu.message.register(self._dispatch, F.text.in_(self.buttons))
+
+    def button(self, text: str):
+        """Декоратор: @router.button("📋 Мої бронювання")."""
+
+        def decorator(handler):
+            if text in self.buttons:
+                raise ValueError(f"Кнопка {text!r} вже зареєстрована")
+            self.buttons[text] = handler
+            return handler
+
+        return decorator
+
+    async def _dispatch(self, message, state):
+        await state.clear()
+        return await self.buttons[message.text](message, state)
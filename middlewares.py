@@ -0,0 +1,111 @@
+"""Middleware диспетчера."""
+import time
+from collections import OrderedDict
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, Message
+
+from config import (CALLBACK_DEDUP_WINDOW, THROTTLE_BURST, THROTTLE_IDLE_TTL,
+                    THROTTLE_RATE)
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Token bucket на користувача + відсіювання повторних callback-ів.
+
+    buckets: uid -> [токени, час останнього запиту, попереджено?]; порядок
+    OrderedDict — за останньою активністю, тож неактивні записи знімаються
+    з початку за O(1). Так само recent: (uid, data, message_id) -> час.
+    """
+
+    def __init__(self,
+                 rate=THROTTLE_RATE,
+                 burst=THROTTLE_BURST,
+                 idle_ttl=THROTTLE_IDLE_TTL,
+                 dedup_window=CALLBACK_DEDUP_WINDOW,
+                 clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        # після burst / rate секунд відро знову повне — запис можна забути
+        self.idle_ttl = max(idle_ttl, burst / rate)
+        self.dedup_window = dedup_window
+        self.clock = clock
+        self.buckets = OrderedDict()
+        self.recent = OrderedDict()
+
+    def _evict(self, now):
+        while self.buckets:
+            uid, bucket = next(iter(self.buckets.items()))
+            if now - bucket[1] < self.idle_ttl:
+                break
+            del self.buckets[uid]
+        while self.recent:
+            key, seen = next(iter(self.recent.items()))
+            if now - seen < self.dedup_window:
+                break
+            del self.recent[key]
+
+    def allow(self, uid, now):
+        """(дозволено?, чи треба попередити користувача)."""
+        bucket = self.buckets.get(uid)
+        if bucket is None:
+            bucket = self.buckets[uid] = [float(self.burst), now, False]
+        else:
+            bucket[0] = min(self.burst,
+                            bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            self.buckets.move_to_end(uid)
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            bucket[2] = False
+            return True, False
+        warn = not bucket[2]
+        bucket[2] = True
+        return False, warn
+
+    def is_duplicate(self, key, now):
+        if key in self.recent:
+            return True
+        self.recent[key] = now
+        return False
+
+    async def __call__(self, handler, event, data):
+        user = data.get("event_from_user")
+        if user is None:
+            return await handler(event, data)
+        now = self.clock()
+        self._evict(now)
+
+        if isinstance(event, CallbackQuery):
+            key = (user.id, event.data,
+                   event.message.message_id if event.message else None)
+            if self.is_duplicate(key, now):
+                await event.answer()
+                return None
+
+        allowed, warn = self.allow(user.id, now)
+        if allowed:
+            return await handler(event, data)
+        if isinstance(event, CallbackQuery):
+            await event.answer("⏳ Зачекайте трохи.")
+        elif isinstance(event, Message) and warn:
+            await event.answer("⏳ Забагато запитів, зачекайте трохи.")
+        return None
+
+
+class RoleMiddleware(BaseMiddleware):
+    """Inner-middleware роутера: роль перевіряється один раз тут, а не в
+    кожному обробнику. Спрацьовує лише тоді, коли обробник уже знайдено."""
+
+    def __init__(self, check, denied_text):
+        self.check = check
+        self.denied_text = denied_text
+
+    async def __call__(self, handler, event, data):
+        user = data.get("event_from_user")
+        if user is not None and self.check(user.id):
+            return await handler(event, data)
+        if isinstance(event, CallbackQuery):
+            await event.answer(self.denied_text, show_alert=True)
+        else:
+            await event.answer(self.denied_text)
+        return None
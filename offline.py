@@ -0,0 +1,75 @@
+"""Офлайн-сесія Bot API: нічого не надсилає в Telegram, лише записує виклики.
+
+    bot = Bot(BOT_TOKEN, session=OfflineSession())
+    await dp.feed_raw_update(bot, update)
+    bot.session.calls  # [(api_method, params), ...]
+"""
+import itertools
+import json
+import time
+
+from aiogram.client.session.base import BaseSession
+from aiogram.types.base import UNSET_TYPE
+
+
+class OfflineSession(BaseSession):
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+        self._ids = itertools.count(1)
+
+    def _result(self, bot, name, params):
+        if name.startswith(("send", "editMessage", "copyMessage")):
+            chat_id = params.get("chat_id") or 0
+            msg = {
+                "message_id": params.get("message_id") or next(self._ids),
+                "date": int(time.time()),
+                "chat": {
+                    "id": chat_id,
+                    "type": "private"
+                },
+                "from": {
+                    "id": bot.id,
+                    "is_bot": True,
+                    "first_name": "bot"
+                },
+            }
+            if "text" in params:
+                msg["text"] = params["text"]
+            if name == "sendDocument":
+                # file_id надісланого раніше — той самий, новий файл — новий
+                doc = params.get("document")
+                file_id = doc if isinstance(doc, str) else \
+                    f"offline-file-{next(self._ids)}"
+                msg["document"] = {"file_id": file_id,
+                                   "file_unique_id": file_id}
+            return msg
+        if name == "getMe":
+            return {"id": bot.id, "is_bot": True, "first_name": "bot",
+                    "username": "offline_bot"}
+        if name == "getUpdates":
+            return []
+        return True
+
+    async def make_request(self, bot, method, timeout=None):
+        name = method.__api_method__
+        params = {
+            k: v
+            for k, v in method.model_dump(exclude_none=True,
+                                          warnings=False).items()
+            if not isinstance(v, UNSET_TYPE)
+        }
+        self.calls.append((name, params))
+        content = json.dumps({
+            "ok": True,
+            "result": self._result(bot, name, params)
+        })
+        return self.check_response(bot, method, 200, content).result
+
+    async def stream_content(self, url, headers=None, timeout=30,
+                             chunk_size=65536, raise_for_status=True):
+        yield b""
+
+    async def close(self):
+        pass
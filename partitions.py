@@ -0,0 +1,423 @@
+"""Розкладка бронювань у сховищі: один документ або частина на день.
+
+BOOKINGS_LAYOUT = "single" — усе в документі "bookings", як і раніше:
+    {uid: {"bookings": [...], "phone": "..."}}
+BOOKINGS_LAYOUT = "daily" — частини документа:
+    bookings/users       {uid: {"phone": "...", "days": ["2025-10-30", ...]}}
+    bookings/2025-10-30  {uid: [бронювання з цією датою, ...]}
+    bookings/meta        версія змінюється з кожним записом бронювань
+Для JsonStore частини — файли в каталозі bookings/, для SQLite — рядки
+таблиці documents.
+
+Пасажир читає лише свої дні (load_user, user_tx), рейс — лише свою дату
+(day_tx). Індекси (TripIndex, PhoneIndex) перечитують лише
+частини, версія яких змінилася (shards, read). Минулі дні переносяться в
+архів цілими частинами (archive). Після зміни BOOKINGS_LAYOUT дані
+переносяться при старті (migrate).
+
+Перш ніж бронювання минулих рейсів видаляються (expire_user в одному
+документі, archive), зайняті місця цих рейсів записуються в документ
+"rollups" (trip_key -> місця) — з нього звіти беруть історію.
+
+    python partitions.py stats
+    python partitions.py archive 2025-10-01 [--drop]
+"""
+import gzip
+import logging
+import os
+import re
+import sys
+from contextlib import contextmanager
+
+import jsonio
+from config import ARCHIVE_DIR, BOOKINGS_LAYOUT
+from store import get_store
+
+log = logging.getLogger("partitions")
+
+LAYOUT = BOOKINGS_LAYOUT
+SINGLE = "bookings"
+USERS = "bookings/users"
+META = "bookings/meta"
+UNDATED = "undated"  # бронювання з датою не у форматі РРРР-ММ-ДД
+
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _daily():
+    return LAYOUT == "daily"
+
+
+def day_of(booking) -> str:
+    date_str = str(booking.get("date"))
+    return date_str if _DATE.fullmatch(date_str) else UNDATED
+
+
+def day_name(day: str) -> str:
+    return f"{SINGLE}/{day}"
+
+
+def shard_of(date_str: str) -> str:
+    """Частина, у якій лежать бронювання цієї дати."""
+    return day_name(day_of({"date": date_str})) if _daily() else SINGLE
+
+
+def users_shard() -> str:
+    """Частина, у якій лежать телефони пасажирів."""
+    return USERS if _daily() else SINGLE
+
+
+# ====================== ДЛЯ ІНДЕКСІВ ======================
+def version(store=None):
+    """Версія всіх бронювань: змінюється з кожним записом."""
+    return (store or get_store()).version(META if _daily() else SINGLE)
+
+
+def shards(store=None):
+    """{частина: версія}. Читати до самих частин (див. read)."""
+    store = store or get_store()
+    if not _daily():
+        return {SINGLE: store.version(SINGLE)}
+    parts = store.parts(SINGLE)
+    parts.pop(META, None)
+    return parts
+
+
+def rows(shard, doc):
+    """Вміст частини як [(uid, телефон | None, [бронювання])]."""
+    if shard == SINGLE:
+        return [(uid, info.get("phone"), info.get("bookings", []))
+                for uid, info in doc.items()]
+    if shard == USERS:
+        return [(uid, e.get("phone"), []) for uid, e in doc.items()]
+    return [(uid, None, lst) for uid, lst in doc.items()]
+
+
+def read(shard, store=None):
+    return rows(shard, (store or get_store()).load(shard, {}))
+
+
+def trip_seats(bookings, keys=None):
+    """{trip_key: місця} бронювань; keys — лише ці рейси."""
+    from trips import trip_key
+
+    seats = {}
+    for b in bookings:
+        try:
+            key = trip_key(b["date"], b["time"], b["direction"])
+            n = int(b["seats"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if keys is None or key in keys:
+            seats[key] = seats.get(key, 0) + n
+    return seats
+
+
+def roll_up(seats, store=None):
+    """Зберігає місця минулих рейсів у "rollups". Після відправлення
+    бронювання рейсу лише прибираються, тож більше значення — повніше."""
+    if not seats:
+        return
+    with (store or get_store()).transaction("rollups", {}) as doc:
+        for key, n in seats.items():
+            doc[key] = max(doc.get(key, 0), n)
+
+
+# ====================== ПАСАЖИР ======================
+def load_user(uid, store=None):
+    """{"bookings": [...], "phone": ...} або None, якщо пасажира немає."""
+    store = store or get_store()
+    if not _daily():
+        return store.load(SINGLE, {}).get(uid)
+    entry = store.load(USERS, {}).get(uid)
+    if entry is None:
+        return None
+    return {
+        "bookings": [
+            b for day in entry["days"]
+            for b in store.load(day_name(day), {}).get(uid, [])
+        ],
+        "phone": entry.get("phone")
+    }
+
+
+def _put(store, day, doc, uid, bookings):
+    """Записує бронювання uid у частину дня, якщо вони змінилися."""
+    if doc.get(uid, []) == bookings:
+        return
+    if bookings:
+        doc[uid] = bookings
+    else:
+        doc.pop(uid, None)
+    if doc:
+        store.save(day_name(day), doc)
+    else:
+        store.delete(day_name(day))
+
+
+@contextmanager
+def user_tx(uid, store=None):
+    """Атомарна зміна запису пасажира {"bookings": [...], "phone": ...};
+    запис створюється, якщо його не було. Пишуться лише змінені дні."""
+    store = store or get_store()
+    if not _daily():
+        with store.transaction(SINGLE, {}) as data:
+            yield data.setdefault(uid, {"bookings": [], "phone": None})
+        return
+    with store.transaction(META, {}):
+        users = store.load(USERS, {})
+        entry = users.get(uid, {"phone": None, "days": []})
+        docs = {day: store.load(day_name(day), {}) for day in entry["days"]}
+        user = {
+            "bookings": [b for day in entry["days"]
+                         for b in docs[day].get(uid, [])],
+            "phone": entry["phone"]
+        }
+        yield user
+        by_day = {}
+        for b in user["bookings"]:
+            by_day.setdefault(day_of(b), []).append(b)
+        for day in docs.keys() | by_day.keys():
+            doc = docs.get(day)
+            if doc is None:
+                doc = store.load(day_name(day), {})
+            _put(store, day, doc, uid, by_day.get(day, []))
+        entry = {"phone": user.get("phone"), "days": sorted(by_day)}
+        if users.get(uid) != entry:
+            users[uid] = entry
+            store.save(USERS, users)
+
+
+def expire_user(uid, now, upcoming, store=None):
+    """Прибирає з запису пасажира минулі поїздки. В одному документі вони
+    видаляються (upcoming(booking, now) -> bool); по днях — пасажир лише
+    забуває минулі дні, а самі частини лишаються для маніфестів і архіву."""
+    store = store or get_store()
+    if not _daily():
+        with store.transaction(SINGLE, {}) as data:
+            if uid in data:
+                info = data[uid]
+                keep = [b for b in info["bookings"] if upcoming(b, now)]
+                past = trip_seats(b for b in info["bookings"]
+                                  if b not in keep)
+                if past:
+                    # рахуємо рейс повністю — з бронюваннями інших пасажирів
+                    roll_up(trip_seats((b for i in data.values()
+                                        for b in i.get("bookings", [])),
+                                       past), store)
+                info["bookings"] = keep
+        return
+    with store.transaction(META, {}):
+        users = store.load(USERS, {})
+        entry = users.get(uid)
+        if entry is not None:
+            today = str(now.date())
+            days = [d for d in entry["days"] if d >= today and d != UNDATED]
+            if days != entry["days"]:
+                users[uid] = dict(entry, days=days)
+                store.save(USERS, users)
+
+
+# ====================== ДЕНЬ ======================
+@contextmanager
+def day_tx(date_str, store=None):
+    """Атомарна зміна бронювань однієї дати кількох пасажирів:
+    {uid: [бронювання]}. Пасажири, яких ще немає, створюються."""
+    store = store or get_store()
+    if not _daily():
+        with store.transaction(SINGLE, {}) as data:
+            old = {}
+            for uid, info in data.items():
+                lst = [b for b in info.get("bookings", [])
+                       if b.get("date") == date_str]
+                if lst:
+                    old[uid] = lst
+            day = {uid: list(lst) for uid, lst in old.items()}
+            yield day
+            for uid in old.keys() | day.keys():
+                if old.get(uid, []) == day.get(uid, []):
+                    continue
+                info = data.setdefault(uid, {"bookings": [], "phone": None})
+                info["bookings"] = [
+                    b for b in info["bookings"] if b.get("date") != date_str
+                ] + day.get(uid, [])
+        return
+    name = day_of({"date": date_str})
+    with store.transaction(META, {}):
+        doc = store.load(day_name(name), {})
+        day = {uid: list(lst) for uid, lst in doc.items()}
+        yield day
+        users, changed = store.load(USERS, {}), False
+        for uid in doc.keys() | day.keys():
+            lst = day.get(uid, [])
+            if doc.get(uid, []) == lst:
+                continue
+            entry = users.setdefault(uid, {"phone": None, "days": []})
+            if lst and name not in entry["days"]:
+                entry["days"] = sorted(entry["days"] + [name])
+            elif not lst and name in entry["days"]:
+                entry["days"].remove(name)
+            else:
+                continue
+            changed = True
+        new = {uid: lst for uid, lst in day.items() if lst}
+        if new != doc:
+            if new:
+                store.save(day_name(name), new)
+            else:
+                store.delete(day_name(name))
+        if changed:
+            store.save(USERS, users)
+
+
+# ====================== УСЯ ІСТОРІЯ ======================
+def _load_daily(store):
+    data = {
+        uid: {"bookings": [], "phone": e.get("phone")}
+        for uid, e in store.load(USERS, {}).items()
+    }
+    for shard in sorted(store.parts(SINGLE)):
+        if shard in (USERS, META):
+            continue
+        for uid, lst in store.load(shard, {}).items():
+            data.setdefault(uid, {"bookings": [], "phone": None})
+            data[uid]["bookings"].extend(lst)
+    return data
+
+
+def load_all(store=None):
+    """Усі бронювання у форматі одного документа (звіти, перевірки)."""
+    store = store or get_store()
+    return _load_daily(store) if _daily() else store.load(SINGLE, {})
+
+
+def migrate(store=None):
+    """Переносить бронювання в поточну розкладку, якщо вони лежать в іншій.
+    Повертає кількість перенесених бронювань."""
+    store = store or get_store()
+    if _daily():
+        with store.transaction(META, {}):
+            data = store.load(SINGLE, {})
+            if not data:
+                return 0
+            users, days = store.load(USERS, {}), {}
+            for uid, info in data.items():
+                entry = users.setdefault(uid, {"phone": None, "days": []})
+                entry["phone"] = entry["phone"] or info.get("phone")
+                for b in info.get("bookings", []):
+                    days.setdefault(day_of(b), {}).setdefault(uid,
+                                                              []).append(b)
+                    if day_of(b) not in entry["days"]:
+                        entry["days"] = sorted(entry["days"] + [day_of(b)])
+            for day, lists in days.items():
+                doc = store.load(day_name(day), {})
+                for uid, lst in lists.items():
+                    doc[uid] = doc.get(uid, []) + lst
+                store.save(day_name(day), doc)
+            store.save(USERS, users)
+            store.save(SINGLE, {})
+    else:
+        parts = store.parts(SINGLE)
+        if not parts.keys() - {META}:
+            return 0
+        with store.transaction(SINGLE, {}) as data:
+            for uid, info in _load_daily(store).items():
+                user = data.setdefault(uid, {"bookings": [], "phone": None})
+                user["bookings"].extend(info["bookings"])
+                user["phone"] = user["phone"] or info["phone"]
+            for name in parts:
+                store.delete(name)
+    moved = sum(len(i.get("bookings", [])) for i in data.values())
+    log.warning("Бронювання перенесено в розкладку %r: %d", LAYOUT, moved)
+    return moved
+
+
+def _write_archive(days, root):
+    os.makedirs(root, exist_ok=True)
+    for day, doc in days.items():
+        path = os.path.join(root, f"{day}.json.gz")
+        if os.path.exists(path):  # частину дня вже архівували раніше
+            with gzip.open(path) as f:
+                for uid, lst in jsonio.loads(f.read()).items():
+                    doc[uid] = lst + doc.get(uid, [])
+        jsonio.write_atomic(path,
+                            gzip.compress(jsonio.dumps(doc, compact=True), 6))
+
+
+def archive(before: str, root=ARCHIVE_DIR, drop=False, store=None):
+    """Переносить бронювання з датою раніше before у root/<дата>.json.gz
+    (drop=True — просто видаляє). По днях це видалення цілих частин, без
+    читання решти історії. Повертає перенесені дні."""
+    store = store or get_store()
+    if not _daily():
+        with store.transaction(SINGLE, {}) as data:
+            days = {}
+            for uid, info in data.items():
+                keep = []
+                for b in info.get("bookings", []):
+                    day = day_of(b)
+                    if day != UNDATED and day < before:
+                        days.setdefault(day, {}).setdefault(uid, []).append(b)
+                    else:
+                        keep.append(b)
+                info["bookings"] = keep
+            roll_up(trip_seats(b for doc in days.values()
+                               for lst in doc.values() for b in lst), store)
+            if not drop:
+                _write_archive(days, root)
+        return sorted(days)
+    with store.transaction(META, {}):
+        days = {}
+        for shard in shards(store):
+            day = shard.split("/", 1)[1]
+            if _DATE.fullmatch(day) and day < before:
+                days[day] = store.load(shard, {})
+        if not days:
+            return []
+        roll_up(trip_seats(b for doc in days.values()
+                           for lst in doc.values() for b in lst), store)
+        if not drop:
+            _write_archive(days, root)
+        for day in days:
+            store.delete(day_name(day))
+        users = store.load(USERS, {})
+        for entry in users.values():
+            entry["days"] = [d for d in entry["days"] if d not in days]
+        store.save(USERS, users)
+    return sorted(days)
+
+
+def stats(store=None):
+    store = store or get_store()
+    parts = shards(store)
+    if not _daily():
+        data = store.load(SINGLE, {})
+        return {"layout": LAYOUT, "users": len(data), "shards": 1,
+                "bookings": sum(len(i.get("bookings", []))
+                                for i in data.values())}
+    days = [s for s in parts if s != USERS]
+    return {"layout": LAYOUT, "users": len(store.load(USERS, {})),
+            "shards": len(days),
+            "bookings": sum(len(lst) for s in days
+                            for lst in store.load(s, {}).values()),
+            "first": min(days, default=None), "last": max(days, default=None)}
+
+
+def main(argv):
+    cmd = argv[0] if argv else None
+    if cmd == "stats":
+        for k, v in stats().items():
+            print(f"{k}: {v}")
+    elif cmd == "archive" and len(argv) > 1 and _DATE.fullmatch(argv[1]):
+        days = archive(argv[1], drop="--drop" in argv)
+        print(f"{'Видалено' if '--drop' in argv else 'В архіві'} днів: "
+              f"{len(days)}")
+    else:
+        print("Використання: python partitions.py stats | "
+              "archive РРРР-ММ-ДД [--drop]")
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
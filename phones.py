@@ -0,0 +1,152 @@
+"""Довідник телефонів пасажирів у форматі E.164.
+
+Водії вводять номери як завгодно ("0686949640", "38 068 694 96 40",
+"+380686949640"), Telegram у контакті дає "380686949640". normalize_phone
+зводить їх до "+380686949640", і PhoneIndex за цим ключем знаходить
+пасажира (uid, у записі якого цей телефон) і всі бронювання з цим номером.
+"""
+import re
+from functools import lru_cache
+
+import partitions
+from records import Booking
+
+_NOT_DIGITS = re.compile(r"\D")
+
+
+@lru_cache(maxsize=4096)
+def normalize_phone(text):
+    """Номер -> E.164 ("+380XXXXXXXXX"); None, якщо це не схоже на номер.
+    Номери без коду країни вважаються українськими."""
+    if not text:
+        return None
+    text = str(text).strip()
+    digits = _NOT_DIGITS.sub("", text)
+    if len(digits) == 12 and digits.startswith("380"):
+        return "+" + digits
+    if len(digits) == 11 and digits.startswith("80"):
+        return "+3" + digits
+    if len(digits) == 10 and digits.startswith("0"):
+        return "+38" + digits
+    if len(digits) == 9 and not text.startswith("+"):
+        return "+380" + digits
+    if text.startswith(("+", "00")) and 8 <= len(digits.lstrip("0")) <= 15:
+        return "+" + digits.lstrip("0")
+    return None
+
+
+class PhoneIndex:
+    """E.164 -> uid власника і -> [(uid, Booking)]. Як і TripIndex,
+    перечитує лише змінені частини бронювань (partitions), а власні зміни
+    отримує через applied. Якщо один номер записано в кількох
+    користувачів, власником вважається перший запис."""
+
+    def __init__(self):
+        self.version = None
+        self.parts = {}  # частина -> [версія, {телефон}]
+        self.owners = {}  # телефон -> {частина: [uid, ...]}
+        self.bookings = {}  # телефон -> {частина: [(uid, Booking)]}
+
+    @property
+    def duplicates(self) -> int:
+        """Записи з номером, який у частині вже має інший користувач."""
+        return sum(len(uids) - 1 for found in self.owners.values()
+                   for uids in found.values())
+
+    def fresh(self, loaded=None):
+        """loaded — як у TripIndex.fresh."""
+        version = partitions.version()
+        if version != self.version:
+            current = partitions.shards()
+            for shard in self.parts.keys() - current.keys():
+                self._drop(shard)
+            for shard, v in current.items():
+                if self.parts.get(shard, [None])[0] == v:
+                    continue
+                rows, lv = (loaded or {}).get(shard, (None, None))
+                self._drop(shard)
+                self._load(shard, v,
+                           rows if lv == v else partitions.read(shard))
+            self.version = version
+        return self
+
+    def _part(self, shard):
+        # нова частина: версії ще немає — перечитається при першій зміні
+        return self.parts.setdefault(shard, [None, set()])[1]
+
+    def _drop(self, shard):
+        for phone in self.parts.pop(shard, [None, ()])[1]:
+            for index in (self.owners, self.bookings):
+                found = index.get(phone, {})
+                found.pop(shard, None)
+                if not found:
+                    index.pop(phone, None)
+
+    def _load(self, shard, version, rows):
+        self.parts[shard] = [version, set()]
+        for uid, phone, raws in rows:
+            self._own(shard, uid, phone)
+            for raw in raws:
+                try:
+                    b = Booking.from_dict(raw)
+                except (KeyError, TypeError, ValueError):
+                    continue
+                self._add(shard, uid, b)
+
+    def _own(self, shard, uid, phone):
+        phone = normalize_phone(phone)
+        if phone is not None:
+            self._part(shard).add(phone)
+            self.owners.setdefault(phone, {}).setdefault(shard,
+                                                         []).append(uid)
+
+    def _disown(self, shard, uid, phone):
+        phone = normalize_phone(phone)
+        uids = self.owners.get(phone, {}).get(shard, [])
+        if uid in uids:
+            uids.remove(uid)
+
+    def _add(self, shard, uid, b: Booking):
+        phone = normalize_phone(b.phone)
+        if phone is not None:
+            self._part(shard).add(phone)
+            self.bookings.setdefault(phone, {}).setdefault(shard,
+                                                           []).append((uid, b))
+
+    def _remove(self, shard, uid, b: Booking):
+        found = self.bookings.get(normalize_phone(b.phone), {}).get(shard, [])
+        if (uid, b) in found:
+            found.remove((uid, b))
+
+    def applied(self, base, added=(), removed=(), phones=()):
+        """Як TripIndex.applied; phones — [(uid, старий, новий)] для
+        телефонів, записаних пасажирам у цій транзакції."""
+        if self.version != base:
+            return  # індекс застарів — перебудується при наступному зверненні
+        for uid, b in removed:
+            self._remove(partitions.shard_of(b.date), uid, b)
+        for uid, b in added:
+            self._add(partitions.shard_of(b.date), uid, b)
+        for uid, old, new in phones:
+            self._disown(partitions.users_shard(), uid, old)
+            self._own(partitions.users_shard(), uid, new)
+        self.version = base + 1
+
+    def owner(self, phone):
+        """uid пасажира з цим номером або None."""
+        phone = normalize_phone(phone)
+        found = self.fresh().owners.get(phone, {}) if phone else {}
+        return next((uids[0] for _, uids in sorted(found.items()) if uids),
+                    None)
+
+    def find(self, phone):
+        """[(uid, Booking)] з цим номером, за часом відправлення."""
+        phone = normalize_phone(phone)
+        if phone is None:
+            return []
+        found = self.fresh().bookings.get(phone, {}).values()
+        return sorted((x for lst in found for x in lst),
+                      key=lambda x: (x[1].day, x[1].minute))
+
+
+phone_index = PhoneIndex()
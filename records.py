@@ -0,0 +1,217 @@
+"""Компактні типізовані записи: бронювання, рейси, водії.
+
+У JSON поля зберігаються рядками ("2", "2025-10-30", "15:00"); у пам'яті —
+дата як ordinal, час як хвилини від півночі, місця як int, напрямок як
+член Direction. to_dict() повертає той самий запис, що лежить у файлах:
+невідомі поля й відсутні необов'язкові ключі зберігаються. Нормалізується
+лише формат — час "ГГ:ХХ" (старе "9:00" або "✅ 15:00" стає "09:00" /
+"15:00"), місця рядком, created_by_driver як bool.
+"""
+import re
+import sys
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from enum import StrEnum
+
+_HHMM = re.compile(r"(\d{1,2}):(\d{2})")
+
+
+class Direction(StrEnum):
+    KYIV_ROKYTNE = "🚐 Київ → Рокитне"
+    ROKYTNE_KYIV = "🚌 Рокитне → Київ"
+
+
+def parse_direction(text: str):
+    """Відомий напрямок -> Direction, інакше інтернований рядок."""
+    try:
+        return Direction(text)
+    except ValueError:
+        return sys.intern(text)
+
+
+def parse_day(text: str) -> int:
+    return date.fromisoformat(text).toordinal()
+
+
+def parse_minute(text: str) -> int:
+    """"15:00" або кнопка "✅ 15:00" -> 900."""
+    m = _HHMM.search(text)
+    if not m:
+        raise ValueError(f"Невірний час: {text!r}")
+    h, mi = int(m.group(1)), int(m.group(2))
+    if h > 23 or mi > 59:
+        raise ValueError(f"Невірний час: {text!r}")
+    return h * 60 + mi
+
+
+def day_str(day: int) -> str:
+    return date.fromordinal(day).isoformat()
+
+
+def minute_str(minute: int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+# необов'язкові ключі бронювання і значення, яке Booking бере за їх
+# відсутності
+_OPTIONAL = {
+    "comment": "",
+    "phone": None,
+    "created_by_driver": False,
+    "driver_id": None,
+    "created_at": None
+}
+_KNOWN = frozenset(("date", "time", "direction", "seats", *_OPTIONAL))
+
+
+@dataclass(slots=True)
+class Booking:
+    day: int
+    minute: int
+    direction: str
+    seats: int
+    comment: str
+    phone: str | None
+    created_by_driver: bool = False
+    driver_id: int | None = None
+    created_at: str | None = None
+    # для to_dict: поля, яких Booking не знає, і необов'язкові ключі, яких
+    # у записі не було; на порівняння бронювань не впливають
+    extra: dict | None = field(default=None, compare=False, repr=False)
+    absent: tuple = field(default=(), compare=False, repr=False)
+
+    @property
+    def date(self) -> str:
+        return day_str(self.day)
+
+    @property
+    def time(self) -> str:
+        return minute_str(self.minute)
+
+    @property
+    def trip(self) -> tuple:
+        return (self.day, self.minute, self.direction)
+
+    @property
+    def departure(self) -> datetime:
+        return datetime.combine(date.fromordinal(self.day),
+                                datetime.min.time()) + timedelta(
+                                    minutes=self.minute)
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Booking":
+        return cls(day=parse_day(d["date"]),
+                   minute=parse_minute(d["time"]),
+                   direction=parse_direction(d["direction"]),
+                   seats=int(d["seats"]),
+                   comment=d.get("comment", ""),
+                   phone=d.get("phone"),
+                   created_by_driver=bool(d.get("created_by_driver")),
+                   driver_id=d.get("driver_id"),
+                   created_at=d.get("created_at"),
+                   extra={k: v
+                          for k, v in d.items() if k not in _KNOWN} or None,
+                   absent=tuple(k for k in _OPTIONAL if k not in d))
+
+    def to_dict(self) -> dict:
+        d = {
+            "date": self.date,
+            "time": self.time,
+            "direction": str(self.direction),
+            "seats": str(self.seats),
+            "comment": self.comment,
+            "phone": self.phone,
+            "created_by_driver": self.created_by_driver,
+            "driver_id": self.driver_id,
+            "created_at": self.created_at
+        }
+        for key in self.absent:
+            if d.get(key, _OPTIONAL[key]) == _OPTIONAL[key]:
+                d.pop(key, None)
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+
+@dataclass(slots=True)
+class Passenger:
+    phone: str | None = None
+    bookings: list = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Passenger":
+        bookings = []
+        for b in d.get("bookings", []):
+            try:
+                bookings.append(Booking.from_dict(b))
+            except (KeyError, TypeError, ValueError):
+                # зіпсований запис — так само, як у clean_and_get_upcoming
+                continue
+        return cls(phone=d.get("phone"), bookings=bookings)
+
+    def to_dict(self) -> dict:
+        return {
+            "bookings": [b.to_dict() for b in self.bookings],
+            "phone": self.phone
+        }
+
+
+@dataclass(slots=True)
+class Route:
+    driver_id: int
+    day: int
+    minute: int
+    direction: str
+
+    @property
+    def key(self) -> str:
+        return (f"{day_str(self.day)} {minute_str(self.minute)} "
+                f"{self.direction}")
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Route":
+        return cls(driver_id=int(d["driver_id"]),
+                   day=parse_day(d["date"]),
+                   minute=parse_minute(d["time"]),
+                   direction=parse_direction(d["direction"]))
+
+    def to_dict(self) -> dict:
+        return {
+            "driver_id": self.driver_id,
+            "date": day_str(self.day),
+            "time": minute_str(self.minute),
+            "direction": str(self.direction)
+        }
+
+
+@dataclass(slots=True)
+class Driver:
+    id: int
+    name: str = "Без імені"
+    phone: str = "—"
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Driver":
+        return cls(id=int(d["id"]),
+                   name=(d.get("name") or "Без імені").strip(),
+                   phone=(d.get("phone") or "—").strip())
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "name": self.name, "phone": self.phone}
+
+
+# ---- Цілі сховища ----
+def passengers_from_json(data: dict) -> dict:
+    return {uid: Passenger.from_dict(info) for uid, info in data.items()}
+
+
+def passengers_to_json(passengers: dict) -> dict:
+    return {uid: p.to_dict() for uid, p in passengers.items()}
+
+
+def routes_from_json(data: dict) -> dict:
+    return {key: Route.from_dict(r) for key, r in data.items()}
+
+
+def routes_to_json(routes: dict) -> dict:
+    return {key: r.to_dict() for key, r in routes.items()}
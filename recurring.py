@@ -0,0 +1,173 @@
+"""Регулярні поїздки: підписка "дні тижня + час + напрямок + місця".
+
+Документ "subscriptions": uid -> [підписка, ...],
+    {"id": 1, "weekdays": [0, 1, 2, 3, 4], "time": "07:00",
+     "direction": "...", "seats": "1", "comment": "...", "phone": "...",
+     "done": ["2025-10-30", ...]}
+done — дати, на які бронювання вже створено (або спроба вже була); тож
+скасоване пасажиром бронювання не з'явиться знову.
+
+materialize() переводить підписки в бронювання на вікно з DAYS днів: на
+кожну дату — одна транзакція дня (partitions.day_tx), і лише якщо є що
+додати. Рейс заблоковано — пропуск; місць немає — пасажир стає в лист
+очікування.
+"""
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+
+from config import RECURRING_INTERVAL
+from partitions import day_tx
+from phones import phone_index
+from records import Booking, parse_minute
+from store import DEFAULTS, get_store
+from trips import (MIN_LEAD, has_room, lock_index, trip_index, trip_key,
+                   waitlist)
+
+log = logging.getLogger("recurring")
+
+DAYS = 7  # як user_dates_7days
+
+_task = None
+
+
+def subscriptions(uid: str):
+    return get_store().load("subscriptions",
+                            DEFAULTS["subscriptions"]).get(uid, [])
+
+
+def add(uid: str, weekdays, booking: dict) -> dict:
+    """Нова підписка за зразком бронювання (час, напрямок, місця, посадка,
+    телефон). Дата самого бронювання одразу позначається як виконана."""
+    with get_store().transaction("subscriptions", {}) as doc:
+        subs = doc.setdefault(uid, [])
+        sub = {
+            "id": max((s["id"] for s in subs), default=0) + 1,
+            "weekdays": sorted(set(weekdays)),
+            "time": booking["time"],
+            "direction": booking["direction"],
+            "seats": booking["seats"],
+            "comment": booking["comment"],
+            "phone": booking.get("phone"),
+            "done": [booking["date"]],
+        }
+        subs.append(sub)
+    return sub
+
+
+def remove(uid: str, sub_id: int) -> bool:
+    with get_store().transaction("subscriptions", {}) as doc:
+        subs = doc.get(uid, [])
+        left = [s for s in subs if s["id"] != sub_id]
+        if len(left) == len(subs):
+            return False
+        doc[uid] = left
+        if not left:
+            del doc[uid]
+    return True
+
+
+def _due(doc, day: date, now: datetime):
+    """[(uid, підписка, trip_key)] на цю дату, ще не виконані."""
+    due = []
+    for uid, subs in doc.items():
+        for sub in subs:
+            if (day.weekday() not in sub["weekdays"]
+                    or str(day) in sub["done"]):
+                continue
+            minute = parse_minute(sub["time"])
+            departure = datetime.combine(day, datetime.min.time()) + \
+                timedelta(minutes=minute)
+            if departure <= now + MIN_LEAD:
+                continue
+            due.append((uid, sub, trip_key(str(day), sub["time"],
+                                           sub["direction"])))
+    return due
+
+
+def _booked_trips(bookings: list) -> set:
+    return {trip_key(b.get("date"), b.get("time"), b.get("direction"))
+            for b in bookings}
+
+
+def materialize(now=None) -> dict:
+    """Створює бронювання з підписок на найближчі DAYS днів. Повертає
+    лічильники: booked, queued, skipped (рейс заблоковано або вже є)."""
+    now = now or datetime.now()
+    stats = {"booked": 0, "queued": 0, "skipped": 0}
+    store = get_store()
+    for offset in range(DAYS):
+        day = now.date() + timedelta(days=offset)
+        due = _due(store.load("subscriptions", DEFAULTS["subscriptions"]),
+                   day, now)
+        if not due:
+            continue
+        created_at = now.strftime("%Y-%m-%d %H:%M:%S")
+        queue, added = [], []
+        with day_tx(str(day)) as data, \
+                store.transaction("subscriptions", {}) as doc:
+            base = trip_index.fresh().version
+            pending = {}  # trip_key -> місця, додані в цій транзакції
+            for uid, sub, key in due:
+                bookings = data.setdefault(uid, [])
+                booking = {
+                    "date": str(day),
+                    "time": sub["time"],
+                    "direction": sub["direction"],
+                    "seats": sub["seats"],
+                    "comment": sub["comment"],
+                    "phone": sub["phone"],
+                    "created_by_driver": False,
+                    "driver_id": None,
+                    "created_at": created_at
+                }
+                seats = int(sub["seats"])
+                if (lock_index.is_locked(key)
+                        or key in _booked_trips(bookings)):
+                    stats["skipped"] += 1
+                elif has_room(key, seats, pending.get(key, 0)):
+                    bookings.append(booking)
+                    added.append((uid, Booking.from_dict(booking)))
+                    pending[key] = pending.get(key, 0) + seats
+                    stats["booked"] += 1
+                else:
+                    queue.append((key, uid, booking))
+                # позначаємо дату в документі (sub — копія з окремого читання)
+                for s in doc.get(uid, []):
+                    if s["id"] == sub["id"]:
+                        s["done"] = [d for d in s["done"]
+                                     if d >= str(now.date())] + [str(day)]
+        trip_index.applied(base, added=added)
+        phone_index.applied(base, added=added)
+        for key, uid, booking in queue:
+            waitlist.push(key, uid, booking)
+            stats["queued"] += 1
+    return stats
+
+
+# ====================== ПЛАНУВАЛЬНИК ======================
+async def _periodic(interval):
+    while True:
+        try:
+            # у потоці циклу: індекси рейсів не розраховані на кілька потоків
+            stats = materialize()
+            if any(stats.values()):
+                log.info("Регулярні поїздки: %s", stats)
+        except Exception:
+            log.exception("Не вдалося створити регулярні бронювання")
+        await asyncio.sleep(interval)
+
+
+async def start(interval=RECURRING_INTERVAL):
+    """Перевіряє підписки одразу і далі кожні interval секунд; нові
+    бронювання з'являються, коли в вікно DAYS днів входить нова дата."""
+    global _task
+    if interval > 0 and _task is None:
+        _task = asyncio.create_task(_periodic(interval))
+
+
+async def stop():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        _task = None
@@ -0,0 +1,192 @@
+"""Офлайн-прогін записаних оновлень через диспетчер — без Telegram.
+
+    python replay.py UPDATES.jsonl [--seed DIR] [--calls OUT.jsonl] [--state]
+    python replay.py --generate USERS > updates.jsonl
+
+UPDATES.jsonl — один об'єкт Update Telegram на рядок (рядки без update_id
+пропускаються). Оновлення подаються в dp.feed_update по черзі, якнайшвидше;
+бот працює з OfflineSession, тож вихідні виклики API лише записуються.
+Дані — у тимчасовій теці (--seed копіює туди JSON-файли з DIR), робочі
+файли бота не змінюються.
+
+Звіт: оновлень за секунду, затримка кожного обробника, виклики API за
+методами і підсумковий стан bookings/routes. --calls пише виклики API у
+JSONL — два прогони до і після зміни можна порівняти diff-ом.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+
+class HandlerTimer(BaseMiddleware):
+    """Inner-middleware диспетчера: час кожного виклику обробника, мс."""
+
+    def __init__(self):
+        self.samples = {}
+
+    @staticmethod
+    def _name(handler, event):
+        callback = handler.callback
+        # кнопки MenuRouter проходять через один _dispatch — розкриваємо
+        buttons = getattr(getattr(callback, "__self__", None), "buttons", None)
+        if buttons is not None and getattr(event, "text", None) in buttons:
+            callback = buttons[event.text]
+        return callback.__name__
+
+    async def __call__(self, handler, event, data):
+        t0 = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            name = self._name(data["handler"], event)
+            self.samples.setdefault(name, []).append(
+                (time.perf_counter() - t0) * 1000)
+
+
+def read_updates(path):
+    updates, skipped = [], 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            raw = json.loads(line)
+            if not isinstance(raw, dict) or "update_id" not in raw:
+                skipped += 1
+                continue
+            updates.append(Update.model_validate(raw))
+    return updates, skipped
+
+
+def generate(users):
+    """Потік бронювань: USERS розмов, перемішаних по кроках."""
+    from cluster import _conversation
+
+    ids = itertools.count(1)
+    convs = [list(_conversation(10**6 + i, ids)) for i in range(users)]
+    for step in zip(*convs):
+        for update in step:
+            print(json.dumps(update, ensure_ascii=False))
+
+
+def _percentile(sorted_ms, q):
+    return sorted_ms[min(len(sorted_ms) - 1, int(q * len(sorted_ms)))]
+
+
+def report(elapsed, n, timer, calls, errors):
+    print(f"updates={n} time={elapsed:.2f}s {n / elapsed:.0f} upd/s "
+          f"errors={errors}")
+    print(f"\n{'handler':<32} {'calls':>6} {'mean ms':>8} {'p50':>7} "
+          f"{'p95':>7} {'max':>7}")
+    for name, ms in sorted(timer.samples.items(),
+                           key=lambda x: -sum(x[1])):
+        ms.sort()
+        print(f"{name:<32} {len(ms):>6} {sum(ms) / len(ms):>8.2f} "
+              f"{_percentile(ms, .5):>7.2f} {_percentile(ms, .95):>7.2f} "
+              f"{ms[-1]:>7.2f}")
+    print("\nAPI: " + ", ".join(
+        f"{m}={c}" for m, c in Counter(m for m, _ in calls).most_common()))
+
+
+def final_state(full):
+    from partitions import load_all
+    from store import get_store
+
+    store = get_store()
+    bookings = load_all(store)
+    routes = store.load("routes", {})
+    records = [b for u in bookings.values() for b in u.get("bookings", [])]
+    print(f"\nbookings: users={len(bookings)} bookings={len(records)} "
+          f"seats={sum(int(b['seats']) for b in records)}")
+    print(f"routes: {len(routes)}")
+    if full:
+        print(json.dumps({"bookings": bookings, "routes": routes},
+                         ensure_ascii=False, indent=2))
+
+
+async def replay(updates, throttle=False):
+    from app import create_bot, create_dispatcher
+    from offline import OfflineSession
+
+    dp = create_dispatcher(throttle=throttle, fsm_storage="memory",
+                           background=False)
+    timer = HandlerTimer()
+    dp.message.middleware(timer)
+    dp.callback_query.middleware(timer)
+    bot = create_bot(session=OfflineSession())
+    await dp.emit_startup(bot=bot, dispatcher=dp)
+
+    errors = 0
+    t0 = time.perf_counter()
+    for update in updates:
+        try:
+            await dp.feed_update(bot, update)
+        except Exception:
+            errors += 1
+    elapsed = time.perf_counter() - t0
+    return elapsed, timer, bot.session.calls, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("updates", nargs="?", help="JSONL з оновленнями")
+    parser.add_argument("--generate", type=int, metavar="USERS",
+                        help="надрукувати синтетичний потік бронювань")
+    parser.add_argument("--seed", metavar="DIR",
+                        help="почати з JSON-файлів із цієї теки")
+    parser.add_argument("--calls", metavar="OUT",
+                        help="записати виклики API у JSONL")
+    parser.add_argument("--state", action="store_true",
+                        help="надрукувати bookings і routes повністю")
+    parser.add_argument("--throttle", action="store_true",
+                        help="увімкнути ThrottlingMiddleware")
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        generate(args.generate)
+        return 0
+    if not args.updates:
+        parser.error("потрібен файл з оновленнями або --generate")
+
+    updates, skipped = read_updates(args.updates)
+    if skipped:
+        print(f"пропущено рядків без update_id: {skipped}", file=sys.stderr)
+
+    from store import DOCUMENTS, PARTITIONED
+
+    calls_out = args.calls and os.path.abspath(args.calls)
+    work = tempfile.mkdtemp(prefix="replay-")
+    for file, _ in DOCUMENTS.values():
+        if args.seed and os.path.exists(os.path.join(args.seed, file)):
+            shutil.copy(os.path.join(args.seed, file), work)
+    for prefix in PARTITIONED:  # бронювання по днях
+        if args.seed and os.path.isdir(os.path.join(args.seed, prefix)):
+            shutil.copytree(os.path.join(args.seed, prefix),
+                            os.path.join(work, prefix))
+    os.chdir(work)  # JsonStore (і SQLITE_PATH за замовчуванням) — відносно cwd
+
+    elapsed, timer, calls, errors = asyncio.run(
+        replay(updates, args.throttle))
+    report(elapsed, len(updates), timer, calls, errors)
+    final_state(args.state)
+    if calls_out:
+        with open(calls_out, "w", encoding="utf-8") as f:
+            for method, params in calls:
+                f.write(json.dumps([method, params], ensure_ascii=False,
+                                   default=str) + "\n")
+    shutil.rmtree(work, ignore_errors=True)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""Сховище документів бота (bookings, routes, locks, admins, drivers,
+waitlist, subscriptions, manifests).
+
+Два бекенди з однаковим інтерфейсом:
+  * JsonStore   — JSON-файли поруч із ботом, для одного процесу;
+  * SqliteStore — одна SQLite-БД, спільна для кількох процесів; кожна
+    транзакція бере BEGIN IMMEDIATE, тож читання-зміна-запис атомарні.
+
+    with get_store().transaction("bookings", {}) as data:
+        data[uid]["bookings"].append(booking)
+
+Документ може зберігатися частинами ("bookings/2025-10-30"): save, load і
+version працюють з частиною як з окремим документом, parts() їх перелічує.
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
+
+import jsonio
+from config import JSON_COMPACT, SQLITE_PATH, STORAGE_BACKEND
+
+# документ -> (файл, компактний формат)
+DOCUMENTS = {
+    "bookings": ("bookings.json", JSON_COMPACT),
+    "routes": ("routes.json", JSON_COMPACT),
+    "locks": ("locks.json", JSON_COMPACT),
+    "admins": ("admins.json", False),
+    "drivers": ("drivers.json", False),
+    "waitlist": ("waitlist.json", JSON_COMPACT),
+    "subscriptions": ("subscriptions.json", JSON_COMPACT),
+    "manifests": ("manifests.json", JSON_COMPACT),
+    "rollups": ("rollups.json", JSON_COMPACT),
+}
+
+# порожній вміст кожного документа
+DEFAULTS = {
+    "bookings": {},
+    "routes": {},
+    "locks": {"locked": []},
+    "admins": {"admins": []},
+    "drivers": {"drivers": []},
+    "waitlist": {},
+    "subscriptions": {},
+    "manifests": {},
+    "rollups": {},
+}
+
+# документи, які можуть зберігатися частинами: "bookings/2025-10-30" — файл
+# bookings/2025-10-30.json або рядок у SQLite (див. partitions.py)
+PARTITIONED = ("bookings", )
+
+
+def spec(name):
+    """(файл, компактний формат) документа або його частини."""
+    if name in DOCUMENTS:
+        return DOCUMENTS[name]
+    prefix, _, part = name.partition("/")
+    if prefix not in PARTITIONED or not part.replace("-", "").isalnum():
+        raise KeyError(name)
+    return os.path.join(prefix, f"{part}.json"), JSON_COMPACT
+
+
+class CorruptDocument(ValueError):
+    """Документ є, але не розбирається. Повертати замість нього порожнє
+    значення не можна: наступний запис зробив би втрату даних остаточною."""
+
+    def __init__(self, name, error):
+        super().__init__(f"Документ {name!r} пошкоджений: {error}")
+        self.name = name
+
+
+class JsonStore:
+
+    def __init__(self, root="."):
+        self.root = root
+        self._lock = threading.RLock()
+        self.versions = {}
+        self.stamps = {}  # документ -> mtime_ns файлу після нашого запису
+
+    def path(self, name):
+        return os.path.join(self.root, spec(name)[0])
+
+    def _stamp(self, name):
+        try:
+            return os.stat(self.path(name)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def load(self, name, default):
+        try:
+            return jsonio.load(self.path(name))
+        except FileNotFoundError:
+            return default
+        except ValueError as e:  # JSONDecodeError, UnicodeDecodeError
+            raise CorruptDocument(name, e) from e
+
+    def save(self, name, obj):
+        with self._lock:
+            path = self.path(name)
+            if "/" in name:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            jsonio.dump(path, obj, compact=spec(name)[1])
+            self.versions[name] = self.versions.get(name, 0) + 1
+            self.stamps[name] = self._stamp(name)
+
+    def delete(self, name):
+        with self._lock:
+            try:
+                os.remove(self.path(name))
+            except FileNotFoundError:
+                pass
+            self.versions[name] = self.versions.get(name, 0) + 1
+            self.stamps[name] = None
+
+    def parts(self, prefix):
+        """{"prefix/частина": версія} для всіх наявних частин документа."""
+        try:
+            files = os.listdir(os.path.join(self.root, prefix))
+        except FileNotFoundError:
+            return {}
+        names = (f"{prefix}/{f[:-5]}" for f in files if f.endswith(".json"))
+        return {name: self.version(name) for name in names}
+
+    @contextmanager
+    def transaction(self, name, default):
+        with self._lock:
+            obj = self.load(name, default)
+            yield obj
+            self.save(name, obj)
+
+    def version(self, name):
+        # файл змінили поза цим процесом (відновлення зі знімка, ручне
+        # редагування) — індекси мають перебудуватися
+        stamp = self._stamp(name)
+        if stamp != self.stamps.get(name):
+            with self._lock:
+                self.stamps[name] = stamp
+                self.versions[name] = self.versions.get(name, 0) + 1
+        return self.versions.get(name, 0)
+
+    def close(self):
+        pass
+
+
+_TOMBSTONE = b"null"
+
+
+class SqliteStore:
+
+    def __init__(self, path, seed_root="."):
+        self.path = path
+        self._local = threading.local()
+        with self._tx() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS documents ("
+                       "name TEXT PRIMARY KEY, body BLOB NOT NULL, "
+                       "version INTEGER NOT NULL)")
+            # одноразовий імпорт існуючих JSON-файлів
+            seed = JsonStore(seed_root)
+            names = list(DOCUMENTS)
+            for prefix in PARTITIONED:
+                names.extend(seed.parts(prefix))
+            for name in names:
+                if self._read(db, name) is None:
+                    obj = seed.load(name, None)
+                    if obj is not None:
+                        self._write(db, name, obj)
+
+    @property
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.depth = 0
+        return db
+
+    @contextmanager
+    def _tx(self):
+        db = self._db
+        if self._local.depth:  # вкладена транзакція — в межах зовнішньої
+            yield db
+            return
+        db.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        else:
+            db.execute("COMMIT")
+        finally:
+            self._local.depth = 0
+
+    @staticmethod
+    def _read(db, name):
+        row = db.execute("SELECT body FROM documents WHERE name = ?",
+                         (name, )).fetchone()
+        if row is None:
+            return None
+        try:
+            return jsonio.loads(row[0])
+        except ValueError as e:
+            raise CorruptDocument(name, e) from e
+
+    @staticmethod
+    def _write(db, name, obj):
+        db.execute(
+            "INSERT INTO documents (name, body, version) VALUES (?, ?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET body = excluded.body, "
+            "version = version + 1", (name, jsonio.dumps(obj, compact=True)))
+
+    def load(self, name, default):
+        obj = self._read(self._db, name)
+        return default if obj is None else obj
+
+    def save(self, name, obj):
+        with self._tx() as db:
+            self._write(db, name, obj)
+
+    @contextmanager
+    def transaction(self, name, default):
+        with self._tx() as db:
+            obj = self._read(db, name)
+            if obj is None:
+                obj = default
+            yield obj
+            self._write(db, name, obj)
+
+    def version(self, name):
+        row = self._db.execute("SELECT version FROM documents WHERE name = ?",
+                               (name, )).fetchone()
+        return row[0] if row else 0
+
+    def delete(self, name):
+        # рядок лишається з body = null: версія документа, створеного
+        # знову, не повинна збігтися з версією видаленого
+        with self._tx() as db:
+            db.execute(
+                "UPDATE documents SET body = ?, version = version + 1 "
+                "WHERE name = ?", (_TOMBSTONE, name))
+
+    def parts(self, prefix):
+        """{"prefix/частина": версія} для всіх наявних частин документа."""
+        # діапазон по первинному ключу: "prefix/" <= name < "prefix0"
+        rows = self._db.execute(
+            "SELECT name, version FROM documents "
+            "WHERE name >= ? AND name < ? AND body != ?",
+            (f"{prefix}/", f"{prefix}0", _TOMBSTONE))
+        return dict(rows)
+
+    def close(self):
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+
+def open_store(backend=STORAGE_BACKEND, path=SQLITE_PATH):
+    if backend == "json":
+        return JsonStore()
+    if backend == "sqlite":
+        return SqliteStore(path)
+    raise ValueError(f"Невідомий STORAGE_BACKEND: {backend!r}")
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = open_store()
+    return _store
+
+
+# ====================== FSM STORAGE ======================
+class SqliteFSMStorage(BaseStorage):
+    """FSM-стан у тій самій SQLite-БД — спільний для всіх воркерів."""
+
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS fsm ("
+                        "key TEXT PRIMARY KEY, state TEXT, data BLOB)")
+
+    @staticmethod
+    def _key(key: StorageKey) -> str:
+        return f"{key.bot_id}:{key.chat_id}:{key.user_id}:{key.destiny}"
+
+    async def set_state(self, key: StorageKey, state=None) -> None:
+        state = state.state if isinstance(state, State) else state
+        self.db.execute(
+            "INSERT INTO fsm (key, state, data) VALUES (?, ?, '{}') "
+            "ON CONFLICT(key) DO UPDATE SET state = excluded.state",
+            (self._key(key), state))
+
+    async def get_state(self, key: StorageKey):
+        row = self.db.execute("SELECT state FROM fsm WHERE key = ?",
+                              (self._key(key), )).fetchone()
+        return row[0] if row else None
+
+    async def set_data(self, key: StorageKey, data) -> None:
+        self.db.execute(
+            "INSERT INTO fsm (key, state, data) VALUES (?, NULL, ?) "
+            "ON CONFLICT(key) DO UPDATE SET data = excluded.data",
+            (self._key(key), jsonio.dumps(data, compact=True)))
+
+    async def get_data(self, key: StorageKey):
+        row = self.db.execute("SELECT data FROM fsm WHERE key = ?",
+                              (self._key(key), )).fetchone()
+        return jsonio.loads(row[0]) if row else {}
+
+    async def close(self) -> None:
+        self.db.close()
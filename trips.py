@@ -0,0 +1,387 @@
+"""Індекси рейсів у пам'яті: бронювання по рейсах, блокування, лист
+очікування.
+
+Кожен індекс пам'ятає версію свого документа у сховищі. Якщо документ
+змінив інший процес (або інший код), індекс перебудовується при першому
+ж зверненні (TripIndex — лише змінені частини бронювань); власні зміни
+всі три застосовують інкрементно.
+"""
+from collections import deque
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import partitions
+from config import TRIP_CAPACITY
+from records import (Booking, Direction, day_str, minute_str, parse_day,
+                     parse_minute)
+from store import DEFAULTS, get_store
+
+_DIRECTIONS = list(Direction)
+MIN_LEAD = timedelta(minutes=20)  # пасажир бронює не пізніше, ніж за стільки
+
+
+def trip_key(date_str: str, time_str: str, direction: str) -> str:
+    return f"{date_str} {time_str} {direction}"
+
+
+def departure(key: str) -> datetime:
+    """Час відправлення рейсу з trip_key."""
+    return datetime.strptime(key[:16], "%Y-%m-%d %H:%M")
+
+
+def departed(key: str, now=None) -> bool:
+    """Рейс уже відправився (або ключ не розбирається)."""
+    try:
+        return departure(key) <= (now or datetime.now())
+    except ValueError:
+        return True
+
+
+def trip_id(key: str):
+    """Короткий ID рейсу для callback_data: "739554.900.0" (ordinal дати,
+    хвилини, номер напрямку). None — якщо напрямок невідомий."""
+    date_str, time_str, direction = key.split(" ", 2)
+    try:
+        d = _DIRECTIONS.index(Direction(direction))
+    except ValueError:
+        return None
+    return f"{parse_day(date_str)}.{parse_minute(time_str)}.{d}"
+
+
+def trip_from_id(tid: str) -> str:
+    day, minute, d = map(int, tid.split("."))
+    return trip_key(day_str(day), minute_str(minute), _DIRECTIONS[d])
+
+
+class _Stamped:
+    """Номери змін індексу: stamps — рейсу, days — дати (будь-якого її
+    рейсу). Хто показує рейс чи день (живі маніфести, availability),
+    порівнює номер і не перераховує те, що не змінилося. stamps
+    упорядковані за зміною, тож changed_since — O(змінених рейсів)."""
+
+    def __init__(self):
+        self.stamps = {}  # trip_key -> номер останньої зміни
+        self.days = {}  # "РРРР-ММ-ДД" -> номер останньої зміни
+        self._changes = 0
+
+    def _touch(self, keys):
+        self._changes += 1
+        for key in keys:
+            self.stamps.pop(key, None)  # у кінець: найсвіжіші — останні
+            self.stamps[key] = self.days[key[:10]] = self._changes
+
+    @property
+    def changes(self) -> int:
+        """Номер останньої зміни."""
+        return self._changes
+
+    def changed_since(self, changes) -> list:
+        """trip_key, змінені після зміни з номером changes."""
+        keys = []
+        for key in reversed(self.stamps):
+            if self.stamps[key] <= changes:
+                break
+            keys.append(key)
+        return keys
+
+
+class TripIndex(_Stamped):
+    """trip_key -> [(uid, Booking)] за часом створення + зайняті місця.
+
+    Бронювання читаються частинами (partitions): при зміні перечитуються
+    лише частини з іншою версією; parts пам'ятає, які рейси дала кожна."""
+
+    def __init__(self):
+        super().__init__()
+        self.version = None
+        self.trips = {}
+        self.seats = {}
+        self.parts = {}  # частина -> [версія, {trip_key}, нерозібраних]
+
+    @property
+    def invalid(self) -> int:
+        """Записи, які не вдалося розібрати."""
+        return sum(p[2] for p in self.parts.values())
+
+    def fresh(self, loaded=None):
+        """loaded — уже прочитані частини {частина: (рядки, версія)}, щоб
+        не читати їх удруге (див. app.preload)."""
+        version = partitions.version()
+        if version != self.version:
+            current = partitions.shards()
+            for shard in self.parts.keys() - current.keys():
+                self._drop(shard)
+            for shard, v in current.items():
+                if self.parts.get(shard, [None])[0] == v:
+                    continue
+                rows, lv = (loaded or {}).get(shard, (None, None))
+                self._drop(shard)
+                self._load(shard, v,
+                           rows if lv == v else partitions.read(shard))
+            self.version = version
+        return self
+
+    def _drop(self, shard):
+        keys = self.parts.pop(shard, [None, ()])[1]
+        for key in keys:
+            self.trips.pop(key, None)
+            self.seats.pop(key, None)
+        self._touch(keys)
+
+    def _load(self, shard, version, rows):
+        keys, invalid = set(), 0
+        for uid, _, bookings in rows:
+            for raw in bookings:
+                try:
+                    b = Booking.from_dict(raw)
+                except (KeyError, TypeError, ValueError):
+                    invalid += 1
+                    continue
+                key = trip_key(b.date, b.time, b.direction)
+                self.trips.setdefault(key, []).append((uid, b))
+                self.seats[key] = self.seats.get(key, 0) + b.seats
+                keys.add(key)
+        for key in keys:
+            self.trips[key].sort(key=lambda x: x[1].created_at or "")
+        self.parts[shard] = [version, keys, invalid]
+        self._touch(keys)
+
+    def bookings(self, key):
+        return [b for _, b in self.fresh().trips.get(key, [])]
+
+    def booked(self, key) -> int:
+        return self.fresh().seats.get(key, 0)
+
+    def _add(self, uid, b: Booking):
+        key = trip_key(b.date, b.time, b.direction)
+        # нова частина: версії ще немає — перечитається при першій зміні
+        part = self.parts.setdefault(partitions.shard_of(b.date),
+                                     [None, set(), 0])
+        part[1].add(key)
+        lst = self.trips.setdefault(key, [])
+        lst.append((uid, b))
+        lst.sort(key=lambda x: x[1].created_at or "")
+        self.seats[key] = self.seats.get(key, 0) + b.seats
+        self._touch((key, ))
+
+    def _remove(self, uid, b: Booking):
+        key = trip_key(b.date, b.time, b.direction)
+        self.trips[key] = [(u, x) for u, x in self.trips.get(key, [])
+                           if not (u == uid and x == b)]
+        self.seats[key] = self.seats.get(key, 0) - b.seats
+        if not self.trips[key]:
+            del self.trips[key], self.seats[key]
+        self._touch((key, ))
+
+    def applied(self, base, added=(), removed=()):
+        """Вносить у індекс зміни однієї транзакції bookings без
+        перебудови: added/removed — [(uid, Booking)]. base — версія
+        bookings, на якій транзакція читала документ."""
+        if self.version != base:
+            return  # індекс застарів — перебудується при наступному зверненні
+        for uid, b in removed:
+            self._remove(uid, b)
+        for uid, b in added:
+            self._add(uid, b)
+        self.version = base + 1
+
+    def passengers(self, key):
+        """uid пасажирів рейсу без повторів. Бронювання, які водій записав
+        на себе (пасажира в боті немає), пропускаються."""
+        return list(
+            dict.fromkeys(uid for uid, b in self.fresh().trips.get(key, [])
+                          if not (b.created_by_driver
+                                  and uid == str(b.driver_id))))
+
+
+class LockIndex(_Stamped):
+    """Множина заблокованих trip_key; документ "locks" = {"locked": [...]}.
+    Перевірка — O(1) по множині, запис — лише одна зміна в документі.
+    Номери змін отримують лише рейси, стан яких справді змінився."""
+
+    def __init__(self):
+        super().__init__()
+        self.version = None
+        self.locked = set()
+
+    def fresh(self):
+        store = get_store()
+        version = store.version("locks")
+        if version != self.version:
+            self.prime(store.load("locks", DEFAULTS["locks"]), version)
+        return self
+
+    def prime(self, doc, version):
+        old, self.locked = self.locked, set(doc.get("locked", []))
+        self._touch(old ^ self.locked)
+        self.version = version
+
+    def is_locked(self, key) -> bool:
+        return key in self.fresh().locked
+
+    def set(self, key, locked: bool) -> bool:
+        """Блокує/розблоковує рейс; False — якщо стан уже такий."""
+        with get_store().transaction("locks", {"locked": []}) as doc:
+            base = self.fresh().version
+            old = set(self.locked)
+            changed = locked != (key in self.locked)
+            if changed and locked:
+                self.locked.add(key)
+            elif changed:
+                self.locked.discard(key)
+            # заодно прибираємо блокування рейсів, що вже минули
+            today = str(date.today())
+            self.locked = {k for k in self.locked if k[:10] >= today}
+            self._touch(old ^ self.locked)
+            doc["locked"] = sorted(self.locked)
+        self.version = base + 1
+        return changed
+
+
+class Waitlist(_Stamped):
+    """FIFO-черга на рейс. Документ "waitlist": trip_key -> [запис, ...],
+    запис = {"uid": "...", "booking": {...}}. У пам'яті — deque на рейс і
+    множина (trip_key, uid): читання (перевірка "чи вже в черзі", розмір,
+    голова) — O(1) без сховища.
+
+    Запис — O(документа), а не O(1): кожна зміна — транзакція над усім
+    документом "waitlist" (сховище перезаписує його цілим), і в ній же
+    _prune проходить документ, прибираючи черги рейсів, що вже
+    відправились, і записи, які ніколи не вмістяться в бус. remove і
+    pop_fitting ще й переписують список рейсу — O(черги). Черги короткі
+    (не довші за кількість охочих на один рейс), а документ містить лише
+    майбутні рейси, тож це дешевше, ніж вело б окреме зберігання голів.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.version = None
+        self.queues = {}
+        self.members = set()
+
+    def fresh(self):
+        store = get_store()
+        version = store.version("waitlist")
+        if version != self.version:
+            self.prime(store.load("waitlist", DEFAULTS["waitlist"]), version)
+        return self
+
+    def prime(self, doc, version):
+        # те саме, що прибере _prune, у пам'яті не чекає наступного запису
+        now = datetime.now()
+        live = ((k, self._live(k, v, now)) for k, v in doc.items())
+        old, self.queues = self.queues, {k: deque(v) for k, v in live if v}
+        self._touch(old.keys() | self.queues.keys())
+        self.members = {(k, e["uid"])
+                        for k, q in self.queues.items() for e in q}
+        self.version = version
+
+    @contextmanager
+    def edit(self):
+        """Транзакція над документом; зміни дублюються в індекс."""
+        with get_store().transaction("waitlist", {}) as doc:
+            base = self.fresh().version
+            self._prune(doc)
+            try:
+                yield doc
+            except BaseException:
+                self.version = None
+                raise
+        self.version = base + 1
+
+    @staticmethod
+    def _live(key, entries, now):
+        if departed(key, now):
+            return []
+        return [e for e in entries
+                if int(e["booking"].get("seats", 1)) <= TRIP_CAPACITY]
+
+    def _prune(self, doc):
+        now = datetime.now()
+        for key in list(doc):
+            keep = self._live(key, doc[key], now)
+            if len(keep) == len(doc[key]):
+                continue
+            self._touch((key, ))
+            for e in doc[key]:
+                self.members.discard((key, e["uid"]))
+            if keep:
+                doc[key] = keep
+                self.queues[key] = deque(keep)
+                self.members.update((key, e["uid"]) for e in keep)
+            else:
+                del doc[key]
+                self.queues.pop(key, None)
+
+    def size(self, key) -> int:
+        return len(self.fresh().queues.get(key, ()))
+
+    def position(self, key, uid):
+        for i, e in enumerate(self.fresh().queues.get(key, ()), 1):
+            if e["uid"] == uid:
+                return i
+        return None
+
+    def entries_for(self, uid):
+        self.fresh()
+        now = datetime.now()
+        return [(k, e) for k, q in self.queues.items() for e in q
+                if e["uid"] == uid and not departed(k, now)]
+
+    def push(self, key, uid, booking) -> int:
+        """Ставить в кінець черги. ValueError — якщо місць більше, ніж у
+        бусі: такий запис ніколи не дочекався б своєї черги."""
+        if int(booking["seats"]) > TRIP_CAPACITY:
+            raise ValueError(f"Не більше {TRIP_CAPACITY} місць.")
+        with self.edit() as doc:
+            if (key, uid) not in self.members:
+                entry = {"uid": uid, "booking": booking}
+                doc.setdefault(key, []).append(entry)
+                self.queues.setdefault(key, deque()).append(entry)
+                self.members.add((key, uid))
+                self._touch((key, ))
+        return self.position(key, uid)
+
+    def remove(self, key, uid) -> bool:
+        with self.edit() as doc:
+            if (key, uid) not in self.members:
+                return False
+            doc[key] = [e for e in doc.get(key, []) if e["uid"] != uid]
+            self.queues[key] = deque(e for e in self.queues[key]
+                                     if e["uid"] != uid)
+            self.members.discard((key, uid))
+            self._touch((key, ))
+            for d in (doc, self.queues):
+                if not d[key]:
+                    del d[key]
+        return True
+
+    def pop_fitting(self, doc, key, free_seats):
+        """Знімає з голови черги записи, поки вони вміщаються (строгий FIFO).
+        Викликати всередині edit()."""
+        queue = self.queues.get(key)
+        taken = []
+        while queue and int(queue[0]["booking"]["seats"]) <= free_seats:
+            entry = queue.popleft()
+            free_seats -= int(entry["booking"]["seats"])
+            self.members.discard((key, entry["uid"]))
+            taken.append(entry)
+        if taken:
+            self._touch((key, ))
+            doc[key] = doc[key][len(taken):]
+            if not queue:
+                del self.queues[key]
+                del doc[key]
+        return taken
+
+
+trip_index = TripIndex()
+lock_index = LockIndex()
+waitlist = Waitlist()
+
+
+def has_room(key: str, seats: int, pending: int = 0) -> bool:
+    """Чи можна бронювати без черги: рейс відкритий, місця є, черга порожня.
+    pending — місця, вже додані на цей рейс у поточній транзакції."""
+    return (not lock_index.is_locked(key) and waitlist.size(key) == 0
+            and trip_index.booked(key) + pending + seats <= TRIP_CAPACITY)